@@ -2,7 +2,7 @@
 Activity detection using SSIM (Structural Similarity Index) to detect screen changes.
 """
 import logging
-from typing import Optional
+from typing import NamedTuple, Optional
 import numpy as np
 import cv2
 from PIL import Image
@@ -11,20 +11,190 @@ from config import config
 
 logger = logging.getLogger(__name__)
 
+# Try to import the SIMD SSIM kernel (AVX2/FMA, multithreaded)
+try:
+    import fast_ssim
+    FAST_SSIM_AVAILABLE = True
+    logger.info("fast-ssim CPU dispatch level: %s", fast_ssim.get_cpu_status())
+except ImportError:
+    FAST_SSIM_AVAILABLE = False
+
+# Try to import xxhash for the identical-frame gate
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+# Try to import numba for the JIT-compiled change metric
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# SSIM stabilising constants for 8-bit data (Wang et al. 2004)
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+# ITU-R BT.601 luma coefficients for R, G, B
+_LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _to_grayscale(array: np.ndarray) -> np.ndarray:
+    """Convert an RGB(A) array to uint8 luma in a single weighted-sum pass."""
+    if array.ndim == 2:
+        return array
+    return np.dot(array[..., :3], _LUMA_WEIGHTS).astype(np.uint8)
+
+
+def _gaussian_window(array: np.ndarray) -> np.ndarray:
+    """Apply the 11x11, sigma 1.5 Gaussian window used for local SSIM statistics."""
+    return cv2.GaussianBlur(array, (11, 11), 1.5)
+
+
+def _local_stats(feature: np.ndarray):
+    """Compute the windowed mean and variance of a float32 feature."""
+    mu = _gaussian_window(feature)
+    var = _gaussian_window(feature * feature) - mu * mu
+    return mu, var
+
+
+def _centered_histogram(feature: np.ndarray) -> np.ndarray:
+    """Compute a mean-centred 256-bin intensity histogram of a uint8 feature."""
+    hist = np.bincount(feature.ravel(), minlength=256).astype(np.float32)
+    hist -= hist.mean()
+    return hist
+
+
+def _dhash(feature: np.ndarray) -> int:
+    """Compute a 64-bit difference hash (horizontal gradient signs on a 9x8 grid)."""
+    small = cv2.resize(feature, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def _frame_hash(image: Image.Image) -> int:
+    """Compute a 64-bit hash of a frame's raw pixel buffer."""
+    # tobytes() is the single full-resolution copy; both hashes read it in place
+    data = image.tobytes()
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(data)
+    return hash(data)
+
+
+if NUMBA_AVAILABLE:
+    def _ncc_kernel(a: np.ndarray, b: np.ndarray) -> float:
+        """Normalized cross-correlation of two equally sized uint8 images, clamped to 0-1."""
+        af = a.ravel()
+        bf = b.ravel()
+        n = af.size
+        
+        sum_a = 0.0
+        sum_b = 0.0
+        for i in range(n):
+            sum_a += af[i]
+            sum_b += bf[i]
+        mean_a = sum_a / n
+        mean_b = sum_b / n
+        
+        cross = 0.0
+        var_a = 0.0
+        var_b = 0.0
+        for i in range(n):
+            da = af[i] - mean_a
+            db = bf[i] - mean_b
+            cross += da * db
+            var_a += da * da
+            var_b += db * db
+        
+        # Flat images: identical only if both are flat at the same level
+        if var_a == 0.0 or var_b == 0.0:
+            return 1.0 if var_a == var_b and mean_a == mean_b else 0.0
+        
+        return max(0.0, cross / np.sqrt(var_a * var_b))
+    
+    # Compiled on the first call, not at import. A 64x48 thumbnail is too small
+    # for threads to pay off, so the kernel runs serially.
+    try:
+        _ncc = njit(fastmath=True, cache=True)(_ncc_kernel)
+    except RuntimeError as e:
+        # Frozen or read-only installs have nowhere to write the on-disk cache
+        logger.debug("numba cache unavailable, compiling NCC kernel per process: %s", e)
+        _ncc = njit(fastmath=True)(_ncc_kernel)
+else:
+    def _ncc(a: np.ndarray, b: np.ndarray) -> float:
+        """Normalized cross-correlation of two equally sized uint8 images, clamped to 0-1."""
+        af = a.astype(np.float32).ravel()
+        bf = b.astype(np.float32).ravel()
+        mean_a = af.mean()
+        mean_b = bf.mean()
+        af -= mean_a
+        bf -= mean_b
+        var_a = float(af @ af)
+        var_b = float(bf @ bf)
+        
+        # Flat images: identical only if both are flat at the same level
+        if var_a == 0.0 or var_b == 0.0:
+            return 1.0 if var_a == var_b and mean_a == mean_b else 0.0
+        
+        return max(0.0, float(af @ bf) / float(np.sqrt(var_a * var_b)))
+
+
+class _PrevStats(NamedTuple):
+    """Reference-frame data computed once when the reference changes."""
+    feature: np.ndarray      # 320x240 uint8 grayscale feature
+    thumbnail: np.ndarray    # 64x48 uint8 thumbnail for the NCC check
+    dhash: int               # 64-bit difference hash of the feature
+    mu: np.ndarray           # windowed mean of the feature
+    var: np.ndarray          # windowed variance of the feature
+    hist: np.ndarray         # mean-centred 256-bin histogram of the feature
+
 
 class ActivityDetector:
     """Detect significant changes in screen content."""
     
-    def __init__(self, similarity_threshold: float = None):
+    # Callers may pass "L" mode frames; colour is discarded before comparison anyway
+    accepts_grayscale = True
+    
+    # Size of the grayscale feature compared between frames
+    FEATURE_SIZE = (320, 240)
+    
+    # Size of the thumbnail used for the fast NCC check
+    THUMBNAIL_SIZE = (64, 48)
+    
+    # NCC scores this far below or above the similarity threshold are re-checked
+    # with full SSIM; the default threshold of 0.95 gives a band of 0.85-0.99
+    NCC_AMBIGUOUS_MARGIN = (0.10, 0.04)
+    
+    # Differing dHash bits (of 64) per unit of dissimilarity (1 - similarity threshold)
+    # above which a frame is changed without further checks; 6 bits at the default 0.95
+    DHASH_BITS_PER_DISSIMILARITY = 120
+    
+    def __init__(self, similarity_threshold: float = None, high_fidelity: bool = None):
         """
         Initialize activity detector.
         
         Args:
             similarity_threshold: Threshold for considering images similar (0-1)
                                 Higher values mean images must be more similar
+            high_fidelity: Always compare frames with full SSIM instead of
+                           the fast NCC check
         """
         self.similarity_threshold = similarity_threshold or config.SIMILARITY_THRESHOLD
-        self.previous_image: Optional[np.ndarray] = None
+        self.high_fidelity = config.HIGH_FIDELITY_ACTIVITY if high_fidelity is None else high_fidelity
+        below, above = self.NCC_AMBIGUOUS_MARGIN
+        self.ncc_ambiguous_band = (
+            max(0.0, self.similarity_threshold - below),
+            min(1.0, self.similarity_threshold + above),
+        )
+        self.dhash_change_bits = min(
+            64, max(1, round((1 - self.similarity_threshold) * self.DHASH_BITS_PER_DISSIMILARITY))
+        )
+        self._prev_stats: Optional[_PrevStats] = None
+        self._prev_hash: int = 0
     
     def has_significant_change(self, current_image: Image.Image) -> bool:
         """
@@ -36,119 +206,149 @@ class ActivityDetector:
         Returns:
             True if there is a significant change, False otherwise
         """
-        # Convert PIL Image to numpy array
-        current_array = np.array(current_image)
+        # Identical to the last frame seen: nothing can have changed
+        frame_hash = _frame_hash(current_image)
+        if frame_hash == self._prev_hash:
+            logger.debug("Frame identical to previous capture, skipping SSIM")
+            return False
+        self._prev_hash = frame_hash
+        
+        current_feature = self._extract_feature(current_image)
+        current_thumbnail = cv2.resize(current_feature, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
         
         # If this is the first image, consider it significant
-        if self.previous_image is None:
-            self.previous_image = current_array
+        if self._prev_stats is None:
+            self._prev_stats = self._compute_prev_stats(current_feature, current_thumbnail)
             return True
         
+        # A large perceptual-hash distance is a change without any pixel comparison
+        if not self.high_fidelity:
+            diff_bits = bin(_dhash(current_feature) ^ self._prev_stats.dhash).count('1')
+            if diff_bits > self.dhash_change_bits:
+                self._prev_stats = self._compute_prev_stats(current_feature, current_thumbnail)
+                logger.info("Significant change detected (dHash distance: %d/64)", diff_bits)
+                return True
+        
         # Calculate similarity
-        similarity = self._calculate_similarity(self.previous_image, current_array)
+        if self.high_fidelity:
+            similarity = self._compare_against_prev(current_feature)
+        else:
+            similarity = _ncc(self._prev_stats.thumbnail, current_thumbnail)
+            low, high = self.ncc_ambiguous_band
+            if low <= similarity < high:
+                similarity = self._compare_against_prev(current_feature)
         
-        logger.debug(f"Image similarity: {similarity:.4f} (threshold: {self.similarity_threshold})")
+        logger.debug("Image similarity: %.4f (threshold: %s)", similarity, self.similarity_threshold)
         
         # Significant change if similarity is below threshold
         has_change = similarity < self.similarity_threshold
         
         if has_change:
-            self.previous_image = current_array
-            logger.info(f"Significant change detected (similarity: {similarity:.4f})")
+            self._prev_stats = self._compute_prev_stats(current_feature, current_thumbnail)
+            logger.info("Significant change detected (similarity: %.4f)", similarity)
         
         return has_change
     
-    def _calculate_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
+    def _extract_feature(self, image: Image.Image) -> np.ndarray:
         """
-        Calculate SSIM between two images.
+        Reduce a frame to the fixed-size grayscale feature used for comparison.
         
         Args:
-            img1: First image as numpy array
-            img2: Second image as numpy array
+            image: PIL Image to reduce
             
         Returns:
-            Similarity score (0-1, where 1 is identical)
+            Contiguous 320x240 uint8 grayscale array
         """
-        try:
-            # Ensure images are the same size
-            if img1.shape != img2.shape:
-                # Resize img2 to match img1
-                img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
-            
-            # Convert to grayscale for faster processing
-            if len(img1.shape) == 3:
-                gray1 = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY)
-            else:
-                gray1 = img1
-            
-            if len(img2.shape) == 3:
-                gray2 = cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY)
-            else:
-                gray2 = img2
-            
-            # Resize to a smaller size for faster comparison
-            small_size = (320, 240)
-            gray1_small = cv2.resize(gray1, small_size)
-            gray2_small = cv2.resize(gray2, small_size)
-            
-            # Calculate SSIM
-            from cv2 import quality
-            score = quality.QualitySSIM_compute(gray1_small, gray2_small)[0]
+        # Downscale first so the grayscale conversion only touches the small image
+        small = image.resize(self.FEATURE_SIZE, Image.Resampling.BILINEAR)
+        return np.ascontiguousarray(_to_grayscale(np.asarray(small)), dtype=np.uint8)
+    
+    def _compute_prev_stats(self, feature: np.ndarray, thumbnail: np.ndarray) -> _PrevStats:
+        """
+        Precompute everything the comparisons need from a new reference frame.
+        
+        Args:
+            feature: 320x240 uint8 grayscale feature
+            thumbnail: 64x48 uint8 thumbnail of the feature
             
-            # Average the score across channels
-            return float(np.mean(score))
+        Returns:
+            Cached reference statistics
+        """
+        mu, var = _local_stats(feature.astype(np.float32))
+        return _PrevStats(feature, thumbnail, _dhash(feature), mu, var, _centered_histogram(feature))
+    
+    def _compare_against_prev(self, current_feature: np.ndarray) -> float:
+        """
+        Compare a feature against the cached reference, falling back to histograms.
+        
+        Args:
+            current_feature: 320x240 uint8 grayscale feature
             
+        Returns:
+            Similarity score (0-1, where 1 is identical)
+        """
+        try:
+            return self._ssim_against_prev(current_feature)
         except Exception as e:
-            logger.warning(f"SSIM calculation failed, using histogram comparison: {e}")
+            logger.warning("SSIM calculation failed, using histogram comparison: %s", e)
             # Fallback to histogram comparison
-            return self._calculate_histogram_similarity(img1, img2)
+            return self._histogram_against_prev(current_feature)
     
-    def _calculate_histogram_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
+    def _ssim_against_prev(self, current_feature: np.ndarray) -> float:
+        """
+        Calculate SSIM between the reference and the current feature.
+        
+        Args:
+            current_feature: 320x240 uint8 grayscale feature
+            
+        Returns:
+            Similarity score (0-1, where 1 is identical)
+        """
+        stats = self._prev_stats
+        
+        if FAST_SSIM_AVAILABLE:
+            return float(fast_ssim.ssim(stats.feature, current_feature, data_range=255))
+        
+        # Only the current frame's statistics and the cross term are computed here
+        current = current_feature.astype(np.float32)
+        mu, var = _local_stats(current)
+        covar = _gaussian_window(stats.feature.astype(np.float32) * current) - stats.mu * mu
+        
+        ssim_map = ((2 * stats.mu * mu + _SSIM_C1) * (2 * covar + _SSIM_C2)) / (
+            (stats.mu * stats.mu + mu * mu + _SSIM_C1) * (stats.var + var + _SSIM_C2)
+        )
+        return float(ssim_map.mean())
+    
+    def _histogram_against_prev(self, current_feature: np.ndarray) -> float:
         """
         Fallback similarity calculation using histogram comparison.
         
         Args:
-            img1: First image as numpy array
-            img2: Second image as numpy array
+            current_feature: 320x240 uint8 grayscale feature
             
         Returns:
             Similarity score (0-1)
         """
         try:
-            # Ensure images are the same size
-            if img1.shape != img2.shape:
-                img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
-            
-            # Convert to grayscale
-            if len(img1.shape) == 3:
-                gray1 = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY)
-                gray2 = cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY)
-            else:
-                gray1 = img1
-                gray2 = img2
-            
-            # Calculate histograms
-            hist1 = cv2.calcHist([gray1], [0], None, [256], [0, 256])
-            hist2 = cv2.calcHist([gray2], [0], None, [256], [0, 256])
-            
-            # Normalize histograms
-            hist1 = cv2.normalize(hist1, hist1).flatten()
-            hist2 = cv2.normalize(hist2, hist2).flatten()
+            prev_hist = self._prev_stats.hist
+            hist = _centered_histogram(current_feature)
             
-            # Calculate correlation
-            correlation = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
+            # Pearson correlation of the two histograms
+            norm = np.linalg.norm(prev_hist) * np.linalg.norm(hist)
+            correlation = float(prev_hist @ hist / (norm + 1e-9))
             
             # Correlation ranges from -1 to 1, normalize to 0-1
             return (correlation + 1) / 2
             
         except Exception as e:
-            logger.error(f"Histogram similarity calculation failed: {e}")
+            logger.error("Histogram similarity calculation failed: %s", e)
             # If all else fails, assume images are different
             return 0.0
     
     def reset(self) -> None:
-        """Reset the detector (clear previous image)."""
-        self.previous_image = None
+        """Reset the detector (clear the reference frame)."""
+        self._prev_stats = None
+        self._prev_hash = 0
         logger.debug("Activity detector reset")
 
 
@@ -166,7 +366,7 @@ if __name__ == "__main__":
         
         # Capture first screenshot
         sct_img = sct.grab(monitor)
-        img1 = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
+        img1 = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX").convert("L")
         
         print(f"First capture - Change detected: {detector.has_significant_change(img1)}")
         
@@ -176,6 +376,6 @@ if __name__ == "__main__":
         
         # Capture second screenshot
         sct_img = sct.grab(monitor)
-        img2 = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
+        img2 = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX").convert("L")
         
         print(f"Second capture - Change detected: {detector.has_significant_change(img2)}")
@@ -2,25 +2,83 @@
 Secure API client for Phoenix backend with IAM authentication.
 """
 import logging
+import queue
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, BinaryIO, Union
 from io import BytesIO
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image
 
 from config import config
 from token_manager import get_auth_token
 
+# Try to import the C-accelerated JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import the streaming multipart encoder
+try:
+    from requests_toolbelt import MultipartEncoder
+    from requests_toolbelt.multipart.encoder import FileWrapper
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
+# Try to load libjpeg-turbo for SIMD JPEG encoding
+try:
+    import numpy as np
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbojpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, RuntimeError, OSError):
+    TURBOJPEG_AVAILABLE = False
+
 from data_cache import DataCache
 from phoenix_logging import get_logger, log_exception
 
 logger = get_logger(__name__)
 
 
+def encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    """
+    Encode an image as JPEG, with libjpeg-turbo when available.
+    
+    Args:
+        image: PIL image to encode
+        quality: JPEG quality (1-100)
+        
+    Returns:
+        JPEG bytes
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    if TURBOJPEG_AVAILABLE:
+        return _turbojpeg.encode(np.asarray(image), quality=quality, pixel_format=TJPF_RGB)
+    
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
 class APIClient:
     """Client for communicating with Phoenix backend."""
     
+    # Screenshots waiting for the upload worker before new ones go to the cache
+    UPLOAD_QUEUE_SIZE = 4
+    
+    # How often an idle upload worker checks whether it has been stopped
+    WORKER_POLL_INTERVAL = 0.5
+    
+    # Upload results the capture loop treats as delivered
+    _UPLOAD_OK_STATUSES = ('success', 'processed', 'rate_limited')
+    
     def __init__(self):
         """Initialize API client."""
         self.token = get_auth_token()
@@ -30,12 +88,23 @@ class APIClient:
         self.session = requests.Session()
         self.session.headers.update({
             'Authorization': f'Bearer {self.token}',
-            'X-Device-ID': config.DEVICE_ID,
-            'User-Agent': f'PhoenixTracker/{config.DEVICE_ID}'
+            'Accept-Encoding': 'gzip'
         })
+        self.session.stream = False
         
-        # Apply security settings
-        self.session.verify = config.VERIFY_SSL
+        # Keep connections alive across heartbeats and uploads. Only failed connects are
+        # retried: every request is a POST, and a screenshot body streamed from the cache
+        # can't be rewound, so 5xx responses go to the cache instead of being re-sent here.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Snapshot settings so requests don't re-read them
+        self.refresh_config()
         
         # Track last request time for rate limiting
         self.last_capture_time = 0
@@ -43,6 +112,44 @@ class APIClient:
         
         # Initialize data cache
         self.cache = DataCache()
+        
+        # Held while the cache is being drained, so only one thread sends pending items
+        self._drain_lock = threading.Lock()
+        
+        # Decides whether close() or a late-finishing upload worker releases the session and cache
+        self._shutdown_lock = threading.Lock()
+        self._worker_exited = False
+        self._worker_releases = False
+        self._stop = threading.Event()
+        
+        # Background uploads that failed since the capture loop last asked
+        self._failure_lock = threading.Lock()
+        self._failed_uploads = 0
+        
+        # Background worker so screenshot uploads never block the capture loop
+        self._upload_queue: queue.Queue = queue.Queue(maxsize=self.UPLOAD_QUEUE_SIZE)
+        self._upload_worker = threading.Thread(
+            target=self._upload_loop,
+            name="phoenix-upload",
+            daemon=True
+        )
+        self._upload_worker.start()
+    
+    def refresh_config(self):
+        """Re-read endpoint, device, timeout and SSL settings from config."""
+        self._heartbeat_url = config.heartbeat_url
+        self._capture_url = config.capture_url
+        self._timeout = config.REQUEST_TIMEOUT
+        self._device_id = config.DEVICE_ID
+        self._jpeg_quality = config.JPEG_QUALITY
+        
+        self.session.headers.update({
+            'X-Device-ID': self._device_id,
+            'User-Agent': f'PhoenixTracker/{self._device_id}'
+        })
+        
+        # Apply security settings
+        self.session.verify = config.VERIFY_SSL
     
     def send_heartbeat(self, app_name: str, window_title: str, is_idle: bool = False) -> Dict[str, Any]:
         """
@@ -64,11 +171,7 @@ class APIClient:
         }
         
         try:
-            response = self.session.post(
-                config.heartbeat_url,
-                json=payload,
-                timeout=config.REQUEST_TIMEOUT
-            )
+            response = self._post_json(self._heartbeat_url, payload)
             response.raise_for_status()
             
             logger.info(f"Heartbeat sent: {app_name}")
@@ -76,7 +179,8 @@ class APIClient:
             # Process pending uploads if connection is good
             self.process_pending_uploads()
             
-            return response.json()
+            # Callers only look at the status, so skip decoding the body
+            return {'status': 'ok', 'status_code': response.status_code}
             
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:
@@ -115,26 +219,16 @@ class APIClient:
             }
         
         data = metadata or {}
-        data['device_id'] = config.DEVICE_ID
+        data['device_id'] = self._device_id
         data['timestamp'] = current_time
         
         try:
-            # Prepare multipart form data
-            files = {
-                'file': ('screenshot.jpg', image_bytes, 'image/jpeg')
-            }
-            
-            response = self.session.post(
-                config.capture_url,
-                files=files,
-                data=data,
-                timeout=config.REQUEST_TIMEOUT
-            )
+            response = self._post_screenshot(image_bytes, data)
             
             self.last_capture_time = current_time
             response.raise_for_status()
             
-            result = response.json()
+            result = self._parse_json(response)
             logger.info(f"Screenshot uploaded: {result.get('status')}")
             
             if result.get('context_summary'):
@@ -150,8 +244,9 @@ class APIClient:
                 logger.error("Authentication failed. Token may be invalid or expired.")
                 raise
             elif e.response.status_code == 422:
-                logger.warning(f"Image processing failed: {e.response.json().get('message')}")
-                return e.response.json()
+                result = self._parse_json(e.response)
+                logger.warning(f"Image processing failed: {result.get('message')}")
+                return result
             elif e.response.status_code == 413:
                 logger.error("Image too large. Try reducing quality or resolution.")
                 raise
@@ -168,43 +263,245 @@ class APIClient:
             self.cache.add_item('screenshot', data, image_bytes)
             return {'status': 'cached', 'error': str(e)}
 
+    def queue_screenshot(self, image, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Hand a screenshot to the background upload worker without waiting on the network.
+        
+        Args:
+            image: JPEG image bytes, or a PIL image to be encoded on the worker thread
+            metadata: Optional metadata to send with the image
+            
+        Returns:
+            True if queued, False if the queue was full and the screenshot was cached instead
+        """
+        try:
+            self._upload_queue.put_nowait((image, metadata))
+            return True
+        except queue.Full:
+            logger.warning("Upload queue full. Caching screenshot for retry.")
+            data = metadata or {}
+            data['device_id'] = self._device_id
+            data['timestamp'] = time.time()
+            self.cache.add_item('screenshot', data, self._as_jpeg(image))
+            return False
+    
+    def _as_jpeg(self, image) -> bytes:
+        """Return JPEG bytes for a queued screenshot, encoding PIL images as needed."""
+        if isinstance(image, Image.Image):
+            return encode_jpeg(image, self._jpeg_quality)
+        return image
+    
+    def take_failed_uploads(self) -> int:
+        """
+        Report background uploads that failed since the last call.
+        
+        Returns:
+            Number of queued screenshots that could not be delivered
+        """
+        with self._failure_lock:
+            failed, self._failed_uploads = self._failed_uploads, 0
+        return failed
+    
+    def _upload_loop(self):
+        """Drain the upload queue on the worker thread until close() stops it."""
+        while not self._stop.is_set():
+            try:
+                item = self._upload_queue.get(timeout=self.WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            delivered = False
+            try:
+                if item is not None:
+                    image, metadata = item
+                    result = self.upload_screenshot(self._as_jpeg(image), metadata)
+                    delivered = result.get('status') in self._UPLOAD_OK_STATUSES
+            except Exception as e:
+                log_exception(e, "Background screenshot upload failed")
+            finally:
+                if item is not None and not delivered:
+                    with self._failure_lock:
+                        self._failed_uploads += 1
+                self._upload_queue.task_done()
+        
+        with self._shutdown_lock:
+            self._worker_exited = True
+            release = self._worker_releases
+        if release:
+            self._release()
+    
+    def close(self, timeout: float = 5.0):
+        """
+        Stop the upload worker and release pooled connections.
+        
+        Screenshots still queued when the worker stops are cached for the next run.
+        
+        Args:
+            timeout: Seconds to wait for an in-flight upload to finish
+        """
+        self._stop.set()
+        try:
+            # Wake an idle worker now; a full queue means it is busy and checks the flag next
+            self._upload_queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._upload_worker.join(timeout=timeout)
+        with self._shutdown_lock:
+            if not self._worker_exited:
+                # Closing now would pull the session and cache out from under the upload
+                logger.warning("Upload worker still busy on close, leaving it to release the session and cache")
+                self._worker_releases = True
+                return
+        
+        self._release()
+    
+    def _release(self):
+        """Cache screenshots the worker never sent, then close pooled connections and the cache."""
+        leftover = []
+        while True:
+            try:
+                item = self._upload_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                image, metadata = item
+                data = metadata or {}
+                data['device_id'] = self._device_id
+                data['timestamp'] = time.time()
+                leftover.append(('screenshot', data, self._as_jpeg(image)))
+        # One batch, so the next run picks them up with the rest of the pending items
+        self.cache.add_items(leftover)
+        
+        self.session.close()
+        self.cache.close()
+    
+    @staticmethod
+    def _parse_json(response: requests.Response) -> Dict[str, Any]:
+        """
+        Decode a JSON response body, with orjson when available.
+        
+        Args:
+            response: HTTP response with a JSON body
+            
+        Returns:
+            Decoded response data
+        """
+        if ORJSON_AVAILABLE:
+            return orjson.loads(response.content)
+        return response.json()
+    
+    def _post_json(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """
+        POST a JSON payload, serialized with orjson when available.
+        
+        Args:
+            url: Endpoint URL
+            payload: JSON-serializable payload
+            
+        Returns:
+            The HTTP response
+        """
+        if ORJSON_AVAILABLE:
+            return self.session.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={'Content-Type': 'application/json'},
+                timeout=self._timeout
+            )
+        
+        return self.session.post(
+            url,
+            json=payload,
+            timeout=self._timeout
+        )
+    
+    def _post_screenshot(self, image: Union[bytes, BinaryIO], data: Dict[str, Any]) -> requests.Response:
+        """
+        POST a screenshot and its metadata as multipart form data.
+        
+        Uses a streaming encoder when requests_toolbelt is installed so the
+        JPEG is not copied into a second boundary-encoded body.
+        
+        Args:
+            image: JPEG image bytes, or a readable file-like object holding them
+            data: Metadata form fields
+            
+        Returns:
+            The HTTP response
+        """
+        if TOOLBELT_AVAILABLE:
+            fields = {k: str(v) for k, v in data.items()}
+            if not isinstance(image, bytes):
+                # Report the bytes still unread so the encoder knows when the stream ends
+                image = FileWrapper(image)
+            fields['file'] = ('screenshot.jpg', image, 'image/jpeg')
+            encoder = MultipartEncoder(fields=fields)
+            return self.session.post(
+                self._capture_url,
+                data=encoder,
+                headers={'Content-Type': encoder.content_type},
+                timeout=self._timeout
+            )
+        
+        files = {
+            'file': ('screenshot.jpg', image, 'image/jpeg')
+        }
+        return self.session.post(
+            self._capture_url,
+            files=files,
+            data=data,
+            timeout=self._timeout
+        )
+    
     def process_pending_uploads(self):
-        """Process pending uploads from the cache."""
-        pending_items = self.cache.get_pending_items(limit=5)
+        """
+        Process pending uploads from the cache.
+        
+        Runs on both the tracker and upload threads; if another thread is
+        already draining the cache, this call returns without doing anything.
+        """
+        if not self._drain_lock.acquire(blocking=False):
+            return
+        try:
+            self._drain_pending_uploads()
+        finally:
+            self._drain_lock.release()
+    
+    def _drain_pending_uploads(self):
+        """Send up to five cached items and remove the ones that were delivered."""
+        # Screenshot bytes are read one at a time, only for items actually sent
+        pending_items = self.cache.get_pending_items(limit=5, with_files=False)
         if not pending_items:
             return
             
         logger.info(f"Processing {len(pending_items)} pending uploads...")
         
+        sent = []
         for item_id, item_type, data, file_data in pending_items:
             try:
                 if item_type == 'heartbeat':
-                    self.session.post(
-                        config.heartbeat_url,
-                        json=data,
-                        timeout=config.REQUEST_TIMEOUT
-                    ).raise_for_status()
+                    self._post_json(self._heartbeat_url, data).raise_for_status()
                     logger.info(f"Processed pending heartbeat (ID: {item_id})")
                     
                 elif item_type == 'screenshot':
-                    files = {
-                        'file': ('screenshot.jpg', file_data, 'image/jpeg')
-                    }
-                    self.session.post(
-                        config.capture_url,
-                        files=files,
-                        data=data,
-                        timeout=config.REQUEST_TIMEOUT
-                    ).raise_for_status()
-                    logger.info(f"Processed pending screenshot (ID: {item_id})")
+                    blob = self.cache.open_file_data(item_id)
+                    if blob is None:
+                        logger.warning(f"Dropping pending screenshot with no image data (ID: {item_id})")
+                    else:
+                        # Stream the JPEG straight from the cache into the request body
+                        with blob:
+                            self._post_screenshot(blob, data).raise_for_status()
+                        logger.info(f"Processed pending screenshot (ID: {item_id})")
                 
-                # Remove from cache on success
-                self.cache.remove_item(item_id)
+                sent.append(item_id)
                 
             except Exception as e:
                 log_exception(e, f"Failed to process pending item {item_id}")
                 # Stop processing to avoid hammering the server if it's still flaky
-                break    
+                break
+        
+        # Remove everything delivered in one transaction
+        self.cache.remove_items(sent)
+    
     def test_connection(self) -> bool:
         """
         Test the connection to Phoenix backend.
@@ -3,14 +3,52 @@ Configuration management for Phoenix Desktop Tracker.
 Now loads settings from Windows Registry via WindowsSettingsManager.
 """
 import os
+import re
 import socket
-from typing import List
+import functools
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
 from windows_settings import settings_manager
 
+
+# Characters not allowed in a generated device ID
+_HOSTNAME_SANITIZER = re.compile(r'[^a-z0-9-]')
+
+
+@functools.lru_cache(maxsize=1)
+def default_device_id() -> str:
+    """Device ID derived from the hostname, which does not change while running."""
+    hostname = _HOSTNAME_SANITIZER.sub('-', socket.gethostname().lower())
+    return f'desktop-{hostname}'
+
+
+def _cached_setting(func):
+    """Turn a method into a property whose value is cached until Config.reload()."""
+    name = func.__name__
+    
+    @functools.wraps(func)
+    def getter(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = func(self)
+            return value
+    
+    return property(getter)
+
+
 class Config:
     """Application configuration loaded from Windows Registry."""
     
-    @property
+    def __init__(self):
+        """Initialize with an empty settings cache."""
+        self._cache: Dict[str, Any] = {}
+    
+    def reload(self) -> None:
+        """Drop cached values so the next access re-reads Windows settings."""
+        self._cache.clear()
+    
+    @_cached_setting
     def PHOENIX_API_URL(self) -> str:
         """Get Phoenix API URL from Windows settings."""
         url = settings_manager.get_phoenix_url()
@@ -19,33 +57,31 @@ class Config:
             return os.getenv('PHOENIX_API_URL', 'https://localhost:8000')
         return url
     
-    @property
+    @_cached_setting
     def DEVICE_ID(self) -> str:
         """Get Device ID from Windows settings."""
         device_id = settings_manager.get_device_id()
         if not device_id:
             # Generate default
-            hostname = socket.gethostname().lower()
-            hostname = ''.join(c if c.isalnum() or c == '-' else '-' for c in hostname)
-            return f'desktop-{hostname}'
+            return default_device_id()
         return device_id
     
-    @property
+    @_cached_setting
     def CAPTURE_INTERVAL(self) -> int:
         """Get capture interval in seconds."""
         return settings_manager.get_capture_interval()
     
-    @property
+    @_cached_setting
     def HEARTBEAT_INTERVAL(self) -> int:
         """Get heartbeat interval in seconds."""
         return settings_manager.get_heartbeat_interval()
     
-    @property
+    @_cached_setting
     def SIMILARITY_THRESHOLD(self) -> float:
         """Get similarity threshold (0-1)."""
         return settings_manager.get_similarity_threshold()
     
-    @property
+    @_cached_setting
     def GAMING_PROCESSES(self) -> List[str]:
         """Get gaming process blacklist."""
         processes = settings_manager.get_setting(
@@ -58,42 +94,101 @@ class Config:
             return [p.strip().lower() for p in processes.split(',')]
         return [p.lower() for p in processes]
     
-    @property
+    @_cached_setting
+    def HIGH_FIDELITY_ACTIVITY(self) -> bool:
+        """Get whether activity detection always uses full SSIM."""
+        return settings_manager.get_setting('high_fidelity_activity', False)
+    
+    @_cached_setting
     def MAX_IMAGE_WIDTH(self) -> int:
         """Get max image width in pixels."""
         return settings_manager.get_setting('max_image_width', 1024)
     
-    @property
+    @_cached_setting
     def JPEG_QUALITY(self) -> int:
         """Get JPEG quality (1-100)."""
         return settings_manager.get_setting('jpeg_quality', 70)
     
-    @property
+    @_cached_setting
     def VERIFY_SSL(self) -> bool:
         """Get SSL verification preference."""
         return settings_manager.get_verify_ssl()
     
-    @property
+    @_cached_setting
     def REQUEST_TIMEOUT(self) -> int:
         """Get request timeout in seconds."""
         return settings_manager.get_setting('request_timeout', 30)
     
-    @property
+    @_cached_setting
     def LOG_LEVEL(self) -> str:
         """Get log level."""
         return settings_manager.get_log_level()
     
-    @property
+    @_cached_setting
+    def _screentime_api(self) -> str:
+        """Get the screentime API base shared by all endpoints."""
+        return f"{self.PHOENIX_API_URL.rstrip('/')}/api/screentime"
+    
+    @_cached_setting
     def heartbeat_url(self) -> str:
         """Get the heartbeat API endpoint."""
-        return f"{self.PHOENIX_API_URL.rstrip('/')}/api/screentime/heartbeat"
+        return f"{self._screentime_api}/heartbeat"
     
-    @property
+    @_cached_setting
     def capture_url(self) -> str:
         """Get the capture API endpoint."""
-        return f"{self.PHOENIX_API_URL.rstrip('/')}/api/screentime/capture"
+        return f"{self._screentime_api}/capture"
+    
+    def resolve(self) -> 'ResolvedConfig':
+        """
+        Read every setting once and return a validated, immutable snapshot.
+        
+        Returns:
+            ResolvedConfig built from the current (cached) settings
+        
+        Raises:
+            ValueError: If any setting is out of range
+        """
+        return ResolvedConfig(
+            PHOENIX_API_URL=self.PHOENIX_API_URL,
+            DEVICE_ID=self.DEVICE_ID,
+            CAPTURE_INTERVAL=self.CAPTURE_INTERVAL,
+            HEARTBEAT_INTERVAL=self.HEARTBEAT_INTERVAL,
+            SIMILARITY_THRESHOLD=self.SIMILARITY_THRESHOLD,
+            GAMING_PROCESSES=tuple(self.GAMING_PROCESSES),
+            HIGH_FIDELITY_ACTIVITY=self.HIGH_FIDELITY_ACTIVITY,
+            MAX_IMAGE_WIDTH=self.MAX_IMAGE_WIDTH,
+            JPEG_QUALITY=self.JPEG_QUALITY,
+            VERIFY_SSL=self.VERIFY_SSL,
+            REQUEST_TIMEOUT=self.REQUEST_TIMEOUT,
+            LOG_LEVEL=self.LOG_LEVEL,
+        )
     
     def validate(self) -> None:
+        """Validate configuration settings."""
+        self.resolve()
+
+
+@dataclass(frozen=True)
+class ResolvedConfig:
+    """Validated, read-only snapshot of the application configuration."""
+    
+    PHOENIX_API_URL: str
+    DEVICE_ID: str
+    CAPTURE_INTERVAL: int
+    HEARTBEAT_INTERVAL: int
+    SIMILARITY_THRESHOLD: float
+    GAMING_PROCESSES: tuple
+    HIGH_FIDELITY_ACTIVITY: bool
+    MAX_IMAGE_WIDTH: int
+    JPEG_QUALITY: int
+    VERIFY_SSL: bool
+    REQUEST_TIMEOUT: int
+    LOG_LEVEL: str
+    heartbeat_url: str = field(init=False)
+    capture_url: str = field(init=False)
+    
+    def __post_init__(self):
         """Validate configuration settings."""
         if not self.PHOENIX_API_URL:
             raise ValueError("PHOENIX_API_URL must be set in Windows Settings")
@@ -109,7 +204,27 @@ class Config:
         
         if not 1 <= self.JPEG_QUALITY <= 100:
             raise ValueError("JPEG_QUALITY must be between 1 and 100")
+        
+        screentime_api = f"{self.PHOENIX_API_URL.rstrip('/')}/api/screentime"
+        object.__setattr__(self, 'heartbeat_url', f"{screentime_api}/heartbeat")
+        object.__setattr__(self, 'capture_url', f"{screentime_api}/capture")
 
 
 # Global config instance
 config = Config()
+
+
+def resolve() -> ResolvedConfig:
+    """
+    Re-read Windows settings and return a validated snapshot.
+    
+    Call this again whenever the settings change.
+    
+    Returns:
+        Frozen ResolvedConfig
+    
+    Raises:
+        ValueError: If any setting is out of range
+    """
+    config.reload()
+    return config.resolve()
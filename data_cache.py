@@ -2,23 +2,126 @@
 Data caching mechanism for Phoenix Tracker.
 Stores failed uploads locally to be retried later.
 """
+import os
 import sqlite3
 import json
 import logging
+import queue
+import threading
 import time
-import os
-from typing import Dict, Any, Optional, List, Tuple
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, BinaryIO
+
+# Try to import the C-accelerated JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import msgpack for compact binary metadata
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
 from phoenix_logging import get_logger, log_exception
 
 logger = get_logger(__name__)
 
+
+if ORJSON_AVAILABLE:
+    def _dumps(data: Dict[str, Any]) -> str:
+        return orjson.dumps(data).decode()
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+
+def _encode_data(data: Dict[str, Any]):
+    """Serialize item metadata, as msgpack bytes when available or JSON text otherwise."""
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(data, use_bin_type=True)
+    return _dumps(data)
+
+
+def _decode_data(raw) -> Dict[str, Any]:
+    """Deserialize item metadata written by either encoding."""
+    if isinstance(raw, bytes):
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("msgpack is required to read packed cache data")
+        return msgpack.unpackb(raw, raw=False)
+    return _loads(raw)
+
+
+class _BlobReader:
+    """Read-only BLOB handle that closes the connection it was opened on."""
+    
+    def __init__(self, conn: sqlite3.Connection, blob):
+        self._conn = conn
+        self._blob = blob
+    
+    def __len__(self) -> int:
+        return len(self._blob)
+    
+    def read(self, size: int = -1) -> bytes:
+        return self._blob.read(size)
+    
+    def seek(self, offset: int, origin: int = os.SEEK_SET) -> None:
+        self._blob.seek(offset, origin)
+    
+    def tell(self) -> int:
+        return self._blob.tell()
+    
+    def close(self) -> None:
+        self._blob.close()
+        self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class DataCache:
     """
     Local cache for storing data when upload fails.
     Uses SQLite to persist data across restarts.
     """
     
+    # Statements are kept verbatim so the connection's statement cache reuses them
+    _SQL_INSERT = "INSERT INTO pending_uploads (ts, type, data) VALUES (?, ?, ?)"
+    _SQL_INSERT_BLOB = "INSERT INTO pending_blobs (id, file_data) VALUES (?, ?)"
+    _SQL_SELECT_PENDING = (
+        "SELECT u.id, u.type, u.data, b.file_data FROM pending_uploads u "
+        "LEFT JOIN pending_blobs b ON b.id = u.id ORDER BY u.ts ASC, u.id ASC LIMIT ?"
+    )
+    _SQL_SELECT_PENDING_META = (
+        "SELECT id, type, data, NULL FROM pending_uploads ORDER BY ts ASC, id ASC LIMIT ?"
+    )
+    _SQL_SELECT_BLOB = "SELECT file_data FROM pending_blobs WHERE id = ?"
+    _SQL_DELETE_ALL = "DELETE FROM pending_uploads"
+    _SQL_DELETE_ALL_BLOBS = "DELETE FROM pending_blobs"
+    _SQL_COUNT = "SELECT COUNT(*) FROM pending_uploads"
+    
+    # PRAGMA user_version once metadata has been repacked as msgpack
+    SCHEMA_VERSION = 1
+    
+    # Largest IN (...) list bound in one statement
+    MAX_SQL_VARIABLES = 900
+    
+    # The writer thread commits once it has this many operations or has waited this long
+    WRITE_BATCH_SIZE = 64
+    WRITE_BATCH_DELAY = 0.1
+    
+    # How often flush() checks that the writer thread is still alive
+    FLUSH_POLL_INTERVAL = 0.5
+    
     def __init__(self, db_path: str = "phoenix_cache.db"):
         """
         Initialize the data cache.
@@ -27,26 +130,241 @@ class DataCache:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        # Pending item count, seeded from the table and kept in step with each write
+        self._count = 0
+        self._page_size = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
         self._init_db()
         
+        # Writes are queued and committed in batches so callers never wait on disk
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._writer_loop,
+            name="phoenix-cache-writer",
+            daemon=True
+        )
+        self._writer.start()
+        
     def _init_db(self):
-        """Initialize the database schema."""
+        """Configure the connection and initialize the database schema."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS pending_uploads (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp REAL NOT NULL,
-                        type TEXT NOT NULL,
-                        data TEXT NOT NULL,
-                        file_data BLOB
+            with self._lock:
+                self._conn.executescript("""
+                    PRAGMA journal_mode=WAL;
+                    PRAGMA synchronous=NORMAL;
+                    PRAGMA temp_store=MEMORY;
+                    PRAGMA cache_size=-65536;
+                    PRAGMA mmap_size=268435456;
+                    PRAGMA busy_timeout=30000;
+                """)
+            
+            with self._transaction() as conn:
+                # Screenshot bytes live out of line so scans of pending_uploads stay small
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS pending_blobs (
+                        id INTEGER PRIMARY KEY,
+                        file_data BLOB NOT NULL
                     )
                 """)
-                conn.commit()
+                
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(pending_uploads)")}
+                if columns and 'ts' not in columns:
+                    self._migrate_legacy_table(conn, columns)
+                else:
+                    self._create_pending_table(conn, 'pending_uploads')
+                
+                if MSGPACK_AVAILABLE and conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                    self._repack_json_rows(conn)
+                    conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                
+                # Lets get_pending_items walk the index instead of sorting the table
+                has_index = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_pending_ts'"
+                ).fetchone()
+                if not has_index:
+                    conn.execute("CREATE INDEX idx_pending_ts ON pending_uploads(ts, id)")
+                    conn.execute("ANALYZE")
+                
+                self._count = conn.execute(self._SQL_COUNT).fetchone()[0]
+                self._page_size = conn.execute("PRAGMA page_size").fetchone()[0]
         except Exception as e:
             log_exception(e, "Failed to initialize cache database")
+    
+    @staticmethod
+    def _repack_json_rows(conn: sqlite3.Connection):
+        """Convert metadata stored as JSON text to msgpack."""
+        rows = conn.execute("SELECT id, data FROM pending_uploads WHERE typeof(data) = 'text'").fetchall()
+        repacked = []
+        for item_id, data_json in rows:
+            try:
+                repacked.append((_encode_data(_loads(data_json)), item_id))
+            except ValueError:
+                logger.error(f"Failed to decode cached data for item {item_id}")
+        conn.executemany("UPDATE pending_uploads SET data = ? WHERE id = ?", repacked)
+    
+    @staticmethod
+    def _create_pending_table(conn: sqlite3.Connection, name: str):
+        """
+        Create the pending uploads table under the given name.
+        
+        Timestamps are integer microseconds. On SQLite 3.37+ the table is STRICT,
+        with data declared ANY so both msgpack and legacy JSON rows are kept as-is.
+        """
+        if sqlite3.sqlite_version_info >= (3, 37, 0):
+            data_type, options = "ANY", " STRICT"
+        else:
+            data_type, options = "BLOB", ""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} (
+                id INTEGER PRIMARY KEY,
+                ts INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                data {data_type} NOT NULL
+            ){options}
+        """)
+    
+    def _migrate_legacy_table(self, conn: sqlite3.Connection, columns: set):
+        """Rebuild a pending_uploads table from an older schema in the current layout."""
+        logger.info("Migrating cache database to the current schema")
+        if 'file_data' in columns:
+            conn.execute(
+                "INSERT OR IGNORE INTO pending_blobs (id, file_data) "
+                "SELECT id, file_data FROM pending_uploads WHERE file_data IS NOT NULL"
+            )
+        # Rebuild rather than ALTER, which can't change column types or drop columns on older SQLite
+        self._create_pending_table(conn, 'pending_uploads_new')
+        conn.execute(
+            "INSERT INTO pending_uploads_new (id, ts, type, data) "
+            "SELECT id, CAST(timestamp * 1000000 AS INTEGER), type, data FROM pending_uploads"
+        )
+        conn.execute("DROP TABLE pending_uploads")
+        conn.execute("ALTER TABLE pending_uploads_new RENAME TO pending_uploads")
+            
+    @contextmanager
+    def _transaction(self):
+        """Hold the lock and run the enclosed statements in one write transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def _writer_loop(self):
+        """Commit queued writes in batches until a stop marker arrives."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.WRITE_BATCH_DELAY
+            # Keep collecting unless someone is waiting on a flush or stop
+            while len(batch) < self.WRITE_BATCH_SIZE and batch[-1][0] not in ('flush', 'stop'):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            writes = [op for op in batch if op[0] not in ('flush', 'stop')]
+            if writes and not self._commit(writes) and len(writes) > 1:
+                # Replay one operation per transaction so only the failing one is lost
+                for write in writes:
+                    self._commit([write])
+            
+            for op, arg in batch:
+                if op == 'flush':
+                    arg.set()
+                elif op == 'stop':
+                    return
+    
+    def _commit(self, writes: List[Tuple[str, Any]]) -> bool:
+        """
+        Run queued write operations in one transaction.
+        
+        Args:
+            writes: (operation, argument) pairs from the write queue
+            
+        Returns:
+            True if committed, False if the transaction was rolled back
+        """
+        # The pending count only moves once the transaction has committed
+        delta = 0
+        cleared = False
+        try:
+            with self._transaction() as conn:
+                for op, arg in writes:
+                    if op == 'clear':
+                        cleared = True
+                        delta = 0
+                    delta += self._apply(conn, op, arg)
+        except Exception as e:
+            log_exception(e, f"Failed to write {len(writes)} cache operation(s)")
+            return False
+        self._count = delta if cleared else self._count + delta
+        return True
+    
+    def _apply(self, conn: sqlite3.Connection, op: str, arg: Any) -> int:
+        """
+        Run one queued write operation inside the writer's transaction.
+        
+        Returns:
+            Change in the number of pending items (0 for 'clear', which empties the table)
+        """
+        if op == 'insert':
+            for ts, item_type, encoded, file_data in arg:
+                item_id = conn.execute(self._SQL_INSERT, (ts, item_type, encoded)).lastrowid
+                if file_data is not None:
+                    conn.execute(self._SQL_INSERT_BLOB, (item_id, file_data))
+            return len(arg)
+        elif op == 'delete':
+            removed = 0
+            # Stay under SQLite's default limit on bound parameters
+            for start in range(0, len(arg), self.MAX_SQL_VARIABLES):
+                chunk = arg[start:start + self.MAX_SQL_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                removed += conn.execute(
+                    f"DELETE FROM pending_uploads WHERE id IN ({placeholders})", chunk
+                ).rowcount
+                conn.execute(f"DELETE FROM pending_blobs WHERE id IN ({placeholders})", chunk)
+            return -removed
+        elif op == 'clear':
+            conn.execute(self._SQL_DELETE_ALL)
+            conn.execute(self._SQL_DELETE_ALL_BLOBS)
+        return 0
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued so far has been committed.
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait as long as the writer runs
             
+        Returns:
+            True if the queue was drained, False on timeout or if the cache is
+            closed or its writer thread has stopped
+        """
+        if self._closed or not self._writer.is_alive():
+            return False
+        
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Wake up now and then so a writer that dies mid-wait can't block the caller forever
+        while True:
+            wait = self.FLUSH_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return done.is_set()
+            if done.wait(wait):
+                return True
+            if not self._writer.is_alive():
+                return done.is_set()
+    
     def add_item(self, item_type: str, data: Dict[str, Any], file_data: Optional[bytes] = None) -> bool:
         """
         Add an item to the cache.
@@ -57,55 +375,135 @@ class DataCache:
             file_data: Optional binary data (e.g., image bytes)
             
         Returns:
-            True if successful, False otherwise
+            True if queued for writing, False otherwise
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO pending_uploads (timestamp, type, data, file_data) VALUES (?, ?, ?, ?)",
-                    (time.time(), item_type, json.dumps(data), file_data)
-                )
-                conn.commit()
-            logger.info(f"Cached {item_type} for later upload")
+        return self.add_items([(item_type, data, file_data)])
+    
+    def add_items(self, items: List[Tuple[str, Dict[str, Any], Optional[bytes]]]) -> bool:
+        """
+        Add several items to the cache in a single transaction.
+        
+        Args:
+            items: List of tuples (type, data, file_data)
+            
+        Returns:
+            True if queued for writing, False otherwise
+        """
+        if not items:
             return True
+        if self._closed:
+            logger.warning(f"Cache is closed, dropping {len(items)} items")
+            return False
+        
+        now = int(time.time() * 1_000_000)
+        try:
+            rows = [(now, item_type, _encode_data(data), file_data) for item_type, data, file_data in items]
         except Exception as e:
             log_exception(e, "Failed to cache item")
             return False
+        
+        self._queue.put(('insert', rows))
+        if len(items) == 1:
+            logger.info(f"Cached {items[0][0]} for later upload")
+        else:
+            logger.info(f"Cached {len(items)} items for later upload")
+        return True
             
-    def get_pending_items(self, limit: int = 10) -> List[Tuple[int, str, Dict[str, Any], Optional[bytes]]]:
+    def get_pending_items(self, limit: int = 10, with_files: bool = True) -> List[Tuple[int, str, Dict[str, Any], Optional[bytes]]]:
         """
         Get pending items from the cache.
         
         Args:
             limit: Maximum number of items to retrieve
+            with_files: Whether to load file_data; if False it is None and
+                can be fetched per item with get_file_data()
             
         Returns:
             List of tuples (id, type, data, file_data)
         """
         items = []
+        if self._closed:
+            return items
+        sql = self._SQL_SELECT_PENDING if with_files else self._SQL_SELECT_PENDING_META
+        self.flush()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id, type, data, file_data FROM pending_uploads ORDER BY timestamp ASC LIMIT ?",
-                    (limit,)
-                )
-                rows = cursor.fetchall()
+            with self._lock:
+                rows = self._conn.execute(sql, (limit,)).fetchall()
                 
-                for row in rows:
-                    item_id, item_type, data_json, file_data = row
-                    try:
-                        data = json.loads(data_json)
-                        items.append((item_id, item_type, data, file_data))
-                    except json.JSONDecodeError:
-                        logger.error(f"Failed to decode cached data for item {item_id}")
-                        # Optionally delete corrupted item? For now, we'll skip it.
-                        
+            for row in rows:
+                item_id, item_type, raw_data, file_data = row
+                try:
+                    data = _decode_data(raw_data)
+                    items.append((item_id, item_type, data, file_data))
+                except ValueError:
+                    logger.error(f"Failed to decode cached data for item {item_id}")
+                    # Optionally delete corrupted item? For now, we'll skip it.
+                    
         except Exception as e:
             log_exception(e, "Failed to retrieve pending items")
             
         return items
+    
+    def get_file_data(self, item_id: int) -> Optional[bytes]:
+        """
+        Read the binary data stored with a cached item.
+        
+        Args:
+            item_id: ID of the item
+            
+        Returns:
+            The file bytes, or None if the item has none
+        """
+        if self._closed:
+            return None
+        self.flush()
+        try:
+            with self._lock:
+                row = self._conn.execute(self._SQL_SELECT_BLOB, (item_id,)).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            log_exception(e, f"Failed to read file data for item {item_id}")
+            return None
+        
+    def open_file_data(self, item_id: int) -> Optional[BinaryIO]:
+        """
+        Open the binary data stored with a cached item for streaming.
+        
+        On Python 3.11+ this is an incremental read-only BLOB handle, so the
+        bytes are read from the database as the caller consumes them. The
+        handle has a read-only connection of its own: commits and rollbacks by
+        the writer thread on the shared connection can't interrupt the read,
+        and WAL keeps the reader on a stable snapshot without blocking writes.
+        
+        Args:
+            item_id: ID of the item
+            
+        Returns:
+            A readable file-like object to be closed by the caller, or None if
+            the item has no file data
+        """
+        if self._closed:
+            return None
+        if not hasattr(self._conn, 'blobopen'):
+            file_data = self.get_file_data(item_id)
+            return BytesIO(file_data) if file_data is not None else None
+        
+        self.flush()
+        try:
+            conn = sqlite3.connect(
+                Path(self.db_path).resolve().as_uri() + "?mode=ro",
+                uri=True, check_same_thread=False, isolation_level=None
+            )
+        except sqlite3.Error as e:
+            log_exception(e, f"Failed to open cache for reading item {item_id}")
+            return None
+        try:
+            blob = conn.blobopen('pending_blobs', 'file_data', item_id, readonly=True)
+        except sqlite3.OperationalError:
+            # No blob row for this item
+            conn.close()
+            return None
+        return _BlobReader(conn, blob)
         
     def remove_item(self, item_id: int) -> bool:
         """
@@ -115,34 +513,37 @@ class DataCache:
             item_id: ID of the item to remove
             
         Returns:
-            True if successful, False otherwise
+            True if queued for removal
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM pending_uploads WHERE id = ?", (item_id,))
-                conn.commit()
-            return True
-        except Exception as e:
-            log_exception(e, f"Failed to remove item {item_id}")
+        return self.remove_items([item_id])
+    
+    def remove_items(self, item_ids: List[int]) -> bool:
+        """
+        Remove several items from the cache in a single transaction.
+        
+        Args:
+            item_ids: IDs of the items to remove
+            
+        Returns:
+            True if queued for removal
+        """
+        if self._closed:
             return False
+        if item_ids:
+            self._queue.put(('delete', list(item_ids)))
+        return True
             
     def clear_cache(self) -> bool:
         """
         Clear all items from the cache.
         
         Returns:
-            True if successful, False otherwise
+            True if queued for clearing
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM pending_uploads")
-                conn.commit()
-            return True
-        except Exception as e:
-            log_exception(e, "Failed to clear cache")
+        if self._closed:
             return False
+        self._queue.put(('clear', None))
+        return True
             
     def get_stats(self) -> Dict[str, int]:
         """
@@ -152,15 +553,27 @@ class DataCache:
             Dictionary with 'count' and 'size_bytes' (approximate)
         """
         stats = {'count': 0, 'size_bytes': 0}
+        if self._closed:
+            return stats
+        self.flush()
         try:
-            if os.path.exists(self.db_path):
-                stats['size_bytes'] = os.path.getsize(self.db_path)
-                
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM pending_uploads")
-                stats['count'] = cursor.fetchone()[0]
+            # Counts pages still in the WAL too, unlike the main file's size on disk
+            with self._lock:
+                page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            stats['size_bytes'] = page_count * self._page_size
+            stats['count'] = self._count
         except Exception as e:
             log_exception(e, "Failed to get cache stats")
             
         return stats
+    
+    def close(self):
+        """Commit any queued writes and close the database connection."""
+        if self._closed:
+            return
+        # Later writes are refused and reads return nothing instead of waiting on the writer
+        self._closed = True
+        self._queue.put(('stop', None))
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
@@ -2,17 +2,26 @@
 Gaming mode detection to pause tracking during gaming sessions.
 """
 import logging
-from typing import List
+import os
+import sys
+import time
+from typing import List, Tuple
 import psutil
 
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Linux truncates /proc/<pid>/comm to this many characters
+_PROC_COMM_LEN = 15
+
 
 class GamingDetector:
     """Detect if user is in a gaming session."""
     
+    # Seconds a check() result is reused before scanning processes again
+    CHECK_TTL = 5.0
+    
     def __init__(self, gaming_processes: List[str] = None):
         """
         Initialize gaming detector.
@@ -20,9 +29,61 @@ class GamingDetector:
         Args:
             gaming_processes: List of process names to detect (case-insensitive)
         """
-        self.gaming_processes = gaming_processes or config.GAMING_PROCESSES
-        # Ensure all process names are lowercase for comparison
-        self.gaming_processes = [p.lower() for p in self.gaming_processes]
+        # Lowercase once so scans compare with a single hash lookup
+        self._gaming_set = frozenset(p.lower() for p in gaming_processes or config.GAMING_PROCESSES)
+        self._build_lookup()
+    
+    @property
+    def gaming_processes(self) -> List[str]:
+        """Lowercase names of the blacklisted gaming processes."""
+        return sorted(self._gaming_set)
+    
+    def _build_lookup(self) -> None:
+        """Rebuild the name lookups used by the process scans."""
+        self._comm_names = {p[:_PROC_COMM_LEN]: p for p in self._gaming_set}
+        # Blacklist changed, so don't reuse the last scan
+        self._last_scan = 0.0
+        self._last_result: Tuple[bool, str] = (False, "")
+    
+    def _find_game(self) -> str:
+        """
+        Scan running processes once for a gaming process.
+        
+        Returns:
+            Name of the first gaming process found, or empty string if none
+        """
+        if sys.platform.startswith('linux'):
+            return self._scan_proc()
+        return self._scan_psutil()
+    
+    def _scan_proc(self) -> str:
+        """Match /proc/<pid>/comm against the blacklist without building Process objects."""
+        # The context manager closes the directory handle on the early return too
+        with os.scandir('/proc') as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f'/proc/{entry.name}/comm', 'rb') as f:
+                        comm = f.read().strip().decode(errors='replace').lower()
+                except OSError:
+                    # Process exited or is not readable
+                    continue
+                game = self._comm_names.get(comm)
+                if game:
+                    return game
+        return ""
+    
+    def _scan_psutil(self) -> str:
+        """Match process names reported by psutil against the blacklist."""
+        for proc in psutil.process_iter(['name']):
+            try:
+                name = proc.info['name']
+                if name and name.lower() in self._gaming_set:
+                    return name
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return ""
     
     def is_gaming(self) -> bool:
         """
@@ -32,21 +93,37 @@ class GamingDetector:
             True if gaming detected, False otherwise
         """
         try:
-            for proc in psutil.process_iter(['name']):
-                try:
-                    process_name = proc.info['name'].lower()
-                    if process_name in self.gaming_processes:
-                        logger.info(f"Gaming detected: {proc.info['name']}")
-                        return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
+            game = self._find_game()
+            if game:
+                logger.info(f"Gaming detected: {game}")
+                return True
             return False
             
         except Exception as e:
             logger.error(f"Error checking gaming processes: {e}")
             return False
     
+    def check(self) -> Tuple[bool, str]:
+        """
+        Check for a running game, reusing the last result for CHECK_TTL seconds.
+        
+        Returns:
+            Tuple of (gaming detected, game process name or empty string)
+        """
+        now = time.monotonic()
+        if self._last_scan and now - self._last_scan < self.CHECK_TTL:
+            return self._last_result
+        
+        try:
+            game = self._find_game()
+        except Exception as e:
+            logger.error(f"Error checking gaming processes: {e}")
+            game = ""
+        
+        self._last_scan = now
+        self._last_result = (bool(game), game)
+        return self._last_result
+    
     def get_running_game(self) -> str:
         """
         Get the name of the currently running game, if any.
@@ -55,15 +132,7 @@ class GamingDetector:
             Name of the game process, or empty string if none detected
         """
         try:
-            for proc in psutil.process_iter(['name']):
-                try:
-                    process_name = proc.info['name'].lower()
-                    if process_name in self.gaming_processes:
-                        return proc.info['name']
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            return ""
+            return self._find_game()
             
         except Exception as e:
             logger.error(f"Error getting game name: {e}")
@@ -93,8 +162,9 @@ class GamingDetector:
             process_name: Name of the process to add
         """
         process_name = process_name.lower()
-        if process_name not in self.gaming_processes:
-            self.gaming_processes.append(process_name)
+        if process_name not in self._gaming_set:
+            self._gaming_set = self._gaming_set | {process_name}
+            self._build_lookup()
             logger.info(f"Added {process_name} to gaming blacklist")
     
     def remove_process(self, process_name: str) -> None:
@@ -105,8 +175,9 @@ class GamingDetector:
             process_name: Name of the process to remove
         """
         process_name = process_name.lower()
-        if process_name in self.gaming_processes:
-            self.gaming_processes.remove(process_name)
+        if process_name in self._gaming_set:
+            self._gaming_set = self._gaming_set - {process_name}
+            self._build_lookup()
             logger.info(f"Removed {process_name} from gaming blacklist")
 
 
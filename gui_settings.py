@@ -3,16 +3,109 @@ Modern Windows 11 Settings Window for Phoenix Desktop Tracker.
 Follows 2025 Fluent Design System guidelines with comprehensive error logging.
 """
 import tkinter as tk
+import tkinter.simpledialog
 from tkinter import ttk, messagebox, font as tkfont
-import socket
-from typing import Optional, Callable
+import re
+from typing import Any, Callable, NamedTuple, Optional, Tuple
 from windows_settings import settings_manager
+from config import default_device_id
 from token_manager import TokenManager
 from phoenix_logging import get_logger, logged_method, log_exception
 import webbrowser
 
 logger = get_logger(__name__)
 
+def _compute_default_device_id() -> str:
+    """Device ID derived from the hostname, or a placeholder if it can't be read."""
+    try:
+        return default_device_id()
+    except Exception as e:
+        log_exception(e, "Failed to generate default device ID")
+        return "desktop-unknown"
+
+
+# Resolved at import so opening the settings window never waits on the hostname lookup
+_DEFAULT_DEVICE_ID = _compute_default_device_id()
+
+# Accepted Phoenix API URL prefixes
+_URL_RE = re.compile(r'^(https://|http://localhost)')
+
+
+def _parse_url(value: str) -> str:
+    """Validate the Phoenix API URL."""
+    url = value.strip()
+    if not url:
+        raise ValueError("Phoenix API URL is required")
+    if not _URL_RE.match(url):
+        raise ValueError("URL must use HTTPS (or http://localhost for testing)")
+    return url
+
+
+def _parse_device_id(value: str) -> str:
+    """Validate the device ID."""
+    device_id = value.strip()
+    if len(device_id) < 3:
+        raise ValueError("Device ID must be at least 3 characters")
+    return device_id
+
+
+def _int_at_least(minimum: int, message: str) -> Callable[[str], int]:
+    """Build a parser for an integer setting with a lower bound."""
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise ValueError(message)
+        return number
+    return parse
+
+
+def _number_between(convert: Callable[[str], Any], low, high, message: str) -> Callable[[str], Any]:
+    """Build a parser for a numeric setting that must lie in [low, high]."""
+    def parse(value: str):
+        number = convert(value)
+        if not low <= number <= high:
+            raise ValueError(message)
+        return number
+    return parse
+
+
+class SettingField(NamedTuple):
+    """One editable setting: where it is shown, how it is stored and validated."""
+    key: str                        # settings_state key
+    page: str                       # nav page the widget lives on
+    widget: str                     # "text", "checkbox" or "dropdown"
+    label: str
+    registry_name: str              # value name in the registry
+    default: Any                    # used when the registry has no value
+    parse: Callable[[Any], Any]     # converts widget state, raises ValueError
+    error: Optional[str] = None     # message prefix for parse errors
+    options: Tuple[str, ...] = ()   # dropdown choices
+
+
+# Every setting the window edits, in display and save order
+SETTING_FIELDS = (
+    SettingField('url', 'server', 'text', "Phoenix API URL", 'phoenix_api_url',
+                 None, _parse_url),
+    SettingField('device_id', 'server', 'text', "Device ID", 'device_id',
+                 None, _parse_device_id),
+    SettingField('capture_interval', 'capture', 'text', "Capture Interval (seconds)", 'capture_interval',
+                 60, _int_at_least(10, "Capture interval must be at least 10 seconds"), "Invalid interval"),
+    SettingField('heartbeat_interval', 'capture', 'text', "Heartbeat Interval (seconds)", 'heartbeat_interval',
+                 60, _int_at_least(10, "Heartbeat interval must be at least 10 seconds"), "Invalid interval"),
+    SettingField('similarity_threshold', 'capture', 'text', "Similarity Threshold (0-1)", 'similarity_threshold',
+                 0.95, _number_between(float, 0, 1, "Similarity threshold must be between 0 and 1"),
+                 "Invalid similarity threshold"),
+    SettingField('max_image_width', 'performance', 'text', "Maximum Image Width (pixels)", 'max_image_width',
+                 1024, _int_at_least(100, "Image width must be at least 100 pixels"), "Invalid performance setting"),
+    SettingField('jpeg_quality', 'performance', 'text', "JPEG Quality (1-100)", 'jpeg_quality',
+                 70, _number_between(int, 1, 100, "JPEG quality must be between 1 and 100"),
+                 "Invalid performance setting"),
+    SettingField('verify_ssl', 'security', 'checkbox', "Verify SSL Certificates", 'verify_ssl',
+                 True, bool),
+    SettingField('log_level', 'advanced', 'dropdown', "Log Level", 'log_level',
+                 "INFO", str, options=("DEBUG", "INFO", "WARNING", "ERROR")),
+)
+
 
 class ModernSettingsWindow:
     """
@@ -26,19 +119,31 @@ class ModernSettingsWindow:
     - Enhanced accessibility
     """
     
-    def __init__(self, on_save: Optional[Callable] = None):
+    # Fixed window size in pixels
+    WIDTH = 900
+    HEIGHT = 650
+    
+    # Shared across windows so re-opening reuses its cached token lookup
+    _shared_token_manager: Optional[TokenManager] = None
+    
+    def __init__(self, on_save: Optional[Callable] = None, parent: Optional[tk.Misc] = None):
         """
         Initialize settings window.
         
         Args:
             on_save: Callback function to call after settings are saved
+            parent: Existing Tk widget to open the window under; defaults to the
+                application's root if one exists, else the window gets its own
         """
         logger.info("Initializing Modern Settings Window")
         self.on_save = on_save
+        self.parent = parent
         self.window = None
-        self.token_manager = TokenManager()
         self.current_page = "server"  # Track current page
         self.settings_state = {}  # Persistent state for settings
+        self.vars = {}  # Tk variables of the fields built so far
+        self._loaded = {}  # Registry values as read by _load_settings
+        self._fonts = {}  # Named fonts shared by all widgets, built in show()
 
         
         # Windows 11 2025 Fluent Design Colors
@@ -57,7 +162,14 @@ class ModernSettingsWindow:
             'nav_active': '#E8F3FF',        # Light blue for active nav
         }
         
-        logger.debug(f"Color scheme initialized: {len(self.colors)} colors defined")
+        logger.debug("Color scheme initialized: %d colors defined", len(self.colors))
+    
+    @property
+    def token_manager(self) -> TokenManager:
+        """Shared TokenManager, created the first time the token page needs it."""
+        if ModernSettingsWindow._shared_token_manager is None:
+            ModernSettingsWindow._shared_token_manager = TokenManager()
+        return ModernSettingsWindow._shared_token_manager
     
     @logged_method
     def show(self):
@@ -70,90 +182,160 @@ class ModernSettingsWindow:
                 return
             
             logger.info("Creating new settings window")
-            self.window = tk.Tk()
+            # Reuse the caller's Tcl interpreter when there is one
+            parent = self.parent or tk._default_root
+            self.window = tk.Toplevel(parent) if parent else tk.Tk()
+            # Keep the window unmapped while it is built so layout happens once
+            self.window.withdraw()
             self.window.title("Settings - Phoenix Tracker")
-            self.window.geometry("900x650")
+            # Size and position in one call, before any widgets exist
+            self._center_window()
             self.window.resizable(False, False)
             self.window.configure(bg=self.colors['bg_primary'])
+            self.window.protocol("WM_DELETE_WINDOW", self._cancel)
+            self._create_fonts()
+            self._create_styles()
             
             # Set window icon (if available)
             try:
                 # Could add icon here
                 pass
             except Exception as e:
-                logger.warning(f"Could not set window icon: {e}")
+                logger.warning("Could not set window icon: %s", e)
             
             self._load_settings()
             self._create_layout()
-            
-            # Center window on screen
-            self._center_window()
+            self.window.deiconify()
             
             logger.info("Settings window created successfully")
-            self.window.mainloop()
+            if parent:
+                self._run_modal(parent)
+            else:
+                self.window.mainloop()
             
         except Exception as e:
             log_exception(e, "Failed to show settings window")
             messagebox.showerror("Error", f"Failed to open settings: {e}")
     
+    def _run_modal(self, parent: tk.Misc):
+        """Block until the window closes, using the parent's event loop."""
+        if parent.winfo_viewable():
+            self.window.transient(parent)
+        try:
+            self.window.wait_visibility()
+            self.window.grab_set()
+        except tk.TclError as e:
+            logger.warning("Could not grab input for settings window: %s", e)
+        self.window.wait_window()
+    
+    def _create_fonts(self):
+        """Create the named fonts once so widgets can share them."""
+        def segoe(size: int, weight: str = "normal") -> tkfont.Font:
+            return tkfont.Font(root=self.window, family="Segoe UI", size=size, weight=weight)
+        
+        self._fonts = {
+            'logo': segoe(14, "bold"),
+            'title': segoe(20, "bold"),
+            'card_title': segoe(12, "bold"),
+            'body': segoe(10),
+            'body_bold': segoe(10, "bold"),
+            'button': segoe(11),
+            'button_bold': segoe(11, "bold"),
+        }
+    
+    def _create_styles(self):
+        """Define the ttk styles shared by labels, frames and checkboxes."""
+        style = ttk.Style(self.window)
+        bg, card = self.colors['bg_primary'], self.colors['card']
+        text, muted = self.colors['text_primary'], self.colors['text_secondary']
+        
+        style.configure('Page.TFrame', background=bg)
+        style.configure('Card.TFrame', background=card)
+        style.configure('Logo.TLabel', font=self._fonts['logo'], background=card, foreground=text)
+        style.configure('PageTitle.TLabel', font=self._fonts['title'], background=bg, foreground=text)
+        style.configure('PageSubtitle.TLabel', font=self._fonts['body'], background=bg, foreground=muted)
+        style.configure('CardTitle.TLabel', font=self._fonts['card_title'], background=card, foreground=text)
+        style.configure('Field.TLabel', font=self._fonts['body'], background=card, foreground=text)
+        style.configure('Status.TLabel', font=self._fonts['body_bold'], background=card)
+        style.configure('Card.TCheckbutton', font=self._fonts['body'], background=card, foreground=text)
+        style.map('Card.TCheckbutton', background=[('active', card)])
+        
+        # tk.Entry has no ttk style, so resolve its options once per window
+        self._entry_options = {
+            'font': self._fonts['body'],
+            'relief': tk.SOLID,
+            'borderwidth': 1,
+            'highlightthickness': 1,
+            'highlightcolor': self.colors['accent'],
+            'highlightbackground': self.colors['border'],
+            'bg': card,
+            'fg': text,
+        }
+    
+    def _close(self):
+        """Destroy the window and release the shared fonts."""
+        self.window.destroy()
+        self._fonts = {}
+    
     def _center_window(self):
-        """Center the window on screen."""
+        """Size the window and center it on screen."""
         try:
-            self.window.update_idletasks()
-            x = (self.window.winfo_screenwidth() // 2) - (self.window.winfo_width() // 2)
-            y = (self.window.winfo_screenheight() // 2) - (self.window.winfo_height() // 2)
-            self.window.geometry(f"+{x}+{y}")
-            logger.debug(f"Window centered at position ({x}, {y})")
+            # The window isn't resizable, so its size is known without a layout pass
+            w, h = self.WIDTH, self.HEIGHT
+            x = (self.window.winfo_screenwidth() - w) // 2
+            y = (self.window.winfo_screenheight() - h) // 2
+            self.window.geometry(f"{w}x{h}+{x}+{y}")
+            logger.debug("Window centered at position (%d, %d)", x, y)
         except Exception as e:
             log_exception(e, "Failed to center window")
     
-    @logged_method
     def _create_layout(self):
         """Create the main window layout with left navigation."""
         try:
             # Main container
-            main_container = tk.Frame(self.window, bg=self.colors['bg_primary'])
+            main_container = ttk.Frame(self.window, style='Page.TFrame')
             main_container.pack(fill=tk.BOTH, expand=True)
             
             # Left navigation pane (Windows 11 style)
-            nav_frame = tk.Frame(
-                main_container,
-                bg=self.colors['card'],
-                width=200
-            )
+            nav_frame = ttk.Frame(main_container, style='Card.TFrame', width=200)
             nav_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 1))
             nav_frame.pack_propagate(False)
             
             # Header in nav
-            header = tk.Label(
+            header = ttk.Label(
                 nav_frame,
                 text="Phoenix Tracker",
-                font=tkfont.Font(family="Segoe UI", size=14, weight="bold"),
-                bg=self.colors['card'],
-                fg=self.colors['text_primary'],
-                pady=20
+                style='Logo.TLabel',
+                padding=(0, 20)
             )
             header.pack(fill=tk.X, padx=15)
             
             # Navigation items
             self.nav_buttons = {}
+            self._nav_bg = {}  # Background each nav button currently shows
+            self._nav_bg_pending = {}  # Hover colors waiting for the next idle apply
             nav_items = [
-                ("server", "🌐 Server", self._show_server_page),
-                ("capture", "⏱️ Capture", self._show_capture_page),
-                ("performance", "⚡ Performance", self._show_performance_page),
-                ("security", "🔒 Security", self._show_security_page),
-                ("token", "🔑 Token", self._show_token_page),
-                ("advanced", "🔧 Advanced", self._show_advanced_page),
+                ("server", "🌐 Server", self._build_server_page),
+                ("capture", "⏱️ Capture", self._build_capture_page),
+                ("performance", "⚡ Performance", self._build_performance_page),
+                ("security", "🔒 Security", self._build_security_page),
+                ("token", "🔑 Token", self._build_token_page),
+                ("advanced", "🔧 Advanced", self._build_advanced_page),
             ]
             
-            for page_id, label, command in nav_items:
+            # Pages are built the first time they are opened
+            self.vars = {}
+            self._pages = {}
+            self._page_builders = {}
+            for page_id, label, builder in nav_items:
+                self._page_builders[page_id] = builder
                 btn = tk.Button(
                     nav_frame,
                     text=label,
-                    command=command,
+                    command=lambda pid=page_id: self._show_page(pid),
                     bg=self.colors['card'],
                     fg=self.colors['text_primary'],
-                    font=tkfont.Font(family="Segoe UI", size=10),
+                    font=self._fonts['body'],
                     relief=tk.FLAT,
                     anchor="w",
                     padx=20,
@@ -165,31 +347,21 @@ class ModernSettingsWindow:
                 self.nav_buttons[page_id] = btn
                 
                 # Add hover effects
-                btn.bind("<Enter>", lambda e, b=btn: b.configure(bg=self.colors['nav_active']))
-                btn.bind("<Leave>", lambda e, b=btn, pid=page_id: b.configure(
-                    bg=self.colors['nav_active'] if pid == self.current_page else self.colors['card']
+                btn.bind("<Enter>", lambda e, pid=page_id: self._hover_nav(pid, self.colors['nav_active']))
+                btn.bind("<Leave>", lambda e, pid=page_id: self._hover_nav(
+                    pid, self.colors['nav_active'] if pid == self.current_page else self.colors['card']
                 ))
             
             # Right side container (Content + Buttons)
-            right_container = tk.Frame(
-                main_container,
-                bg=self.colors['bg_primary']
-            )
+            right_container = ttk.Frame(main_container, style='Page.TFrame')
             right_container.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
             # Content area (Scrollable or just frame)
-            self.content_frame = tk.Frame(
-                right_container,
-                bg=self.colors['bg_primary']
-            )
+            self.content_frame = ttk.Frame(right_container, style='Page.TFrame')
             self.content_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
             
             # Bottom button bar (Fixed at bottom of right side)
-            button_bar = tk.Frame(
-                right_container,
-                bg=self.colors['card'],
-                height=70
-            )
+            button_bar = ttk.Frame(right_container, style='Card.TFrame', height=70)
             button_bar.pack(side=tk.BOTTOM, fill=tk.X)
             button_bar.pack_propagate(False)
             
@@ -200,7 +372,7 @@ class ModernSettingsWindow:
                 command=self._save_settings,
                 bg=self.colors['accent'],
                 fg="white",
-                font=tkfont.Font(family="Segoe UI", size=11, weight="bold"),
+                font=self._fonts['button_bold'],
                 relief=tk.FLAT,
                 padx=40,
                 pady=10,
@@ -216,7 +388,7 @@ class ModernSettingsWindow:
                 command=self._cancel,
                 bg=self.colors['bg_primary'],
                 fg=self.colors['text_primary'],
-                font=tkfont.Font(family="Segoe UI", size=11),
+                font=self._fonts['button'],
                 relief=tk.FLAT,
                 padx=30,
                 pady=10,
@@ -224,8 +396,12 @@ class ModernSettingsWindow:
             )
             cancel_btn.pack(side=tk.RIGHT, padx=5, pady=15)
             
+            # Ctrl+Tab / Ctrl+Shift+Tab cycle pages like notebook tabs
+            self.window.bind("<Control-Tab>", lambda e: self._cycle_page(1))
+            self.window.bind("<Control-Shift-Tab>", lambda e: self._cycle_page(-1))
+            
             # Create initial page
-            self._show_server_page()
+            self._show_page("server")
             
             logger.debug("Layout created successfully")
             
@@ -234,55 +410,79 @@ class ModernSettingsWindow:
             raise
     
     def _set_active_nav(self, page_id: str):
-        """Highlight the active navigation item."""
+        """Highlight the active navigation item, restyling only the old and new buttons."""
         try:
+            previous = self.nav_buttons.get(self.current_page)
+            if previous is not None and self.current_page != page_id:
+                previous.configure(bg=self.colors['card'], font=self._fonts['body'])
+                self._nav_bg[self.current_page] = self.colors['card']
+            
+            self.nav_buttons[page_id].configure(bg=self.colors['nav_active'], font=self._fonts['body_bold'])
+            self._nav_bg[page_id] = self.colors['nav_active']
             self.current_page = page_id
-            for pid, btn in self.nav_buttons.items():
-                if pid == page_id:
-                    btn.configure(bg=self.colors['nav_active'], font=tkfont.Font(family="Segoe UI", size=10, weight="bold"))
-                else:
-                    btn.configure(bg=self.colors['card'], font=tkfont.Font(family="Segoe UI", size=10))
-            logger.debug(f"Active navigation set to: {page_id}")
+            logger.debug("Active navigation set to: %s", page_id)
         except Exception as e:
             log_exception(e, f"Failed to set active nav: {page_id}")
     
-    def _clear_content(self):
-        """Clear the content area."""
+    def _hover_nav(self, page_id: str, color: str):
+        """Queue a hover background change; bursts of motion events collapse into one apply."""
+        pending = page_id in self._nav_bg_pending
+        self._nav_bg_pending[page_id] = color
+        if not pending:
+            self.window.after_idle(self._apply_nav_bg, page_id)
+    
+    def _apply_nav_bg(self, page_id: str):
+        """Apply the latest queued hover color, skipping it if nothing changes."""
+        color = self._nav_bg_pending.pop(page_id, None)
+        if color is None or self._nav_bg.get(page_id) == color:
+            return
+        self._nav_bg[page_id] = color
+        self.nav_buttons[page_id].configure(bg=color)
+    
+    def _show_page(self, page_id: str):
+        """Show a page, building it on first use and hiding the current one."""
+        if page_id == self.current_page and page_id in self._pages:
+            return
         try:
-            for widget in self.content_frame.winfo_children():
-                widget.destroy()
-            logger.debug("Content area cleared")
+            current = self._pages.get(self.current_page)
+            if current is not None:
+                current.pack_forget()
+            
+            page = self._pages.get(page_id)
+            if page is None:
+                page = ttk.Frame(self.content_frame, style='Page.TFrame')
+                self._page_builders[page_id](page)
+                self._pages[page_id] = page
+                logger.debug("Page built: %s", page_id)
+            
+            page.pack(fill=tk.BOTH, expand=True)
+            self._set_active_nav(page_id)
         except Exception as e:
-            log_exception(e, "Failed to clear content")
+            log_exception(e, f"Failed to show page: {page_id}")
+    
+    def _cycle_page(self, step: int):
+        """Show the page `step` positions away from the current one in nav order."""
+        order = list(self.nav_buttons)
+        index = order.index(self.current_page) if self.current_page in order else 0
+        self._show_page(order[(index + step) % len(order)])
+        return "break"
     
     def _create_page_header(self, parent, title: str, subtitle: str = ""):
         """Create a modern page header with hero control."""
         try:
-            header_frame = tk.Frame(parent, bg=self.colors['bg_primary'])
+            header_frame = ttk.Frame(parent, style='Page.TFrame')
             header_frame.pack(fill=tk.X, padx=25, pady=(25, 15))
             
             # Title
-            title_label = tk.Label(
-                header_frame,
-                text=title,
-                font=tkfont.Font(family="Segoe UI", size=20, weight="bold"),
-                bg=self.colors['bg_primary'],
-                fg=self.colors['text_primary']
-            )
+            title_label = ttk.Label(header_frame, text=title, style='PageTitle.TLabel')
             title_label.pack(anchor="w")
             
             # Subtitle if provided
             if subtitle:
-                subtitle_label = tk.Label(
-                    header_frame,
-                    text=subtitle,
-                    font=tkfont.Font(family="Segoe UI", size=10),
-                    bg=self.colors['bg_primary'],
-                    fg=self.colors['text_secondary']
-                )
+                subtitle_label = ttk.Label(header_frame, text=subtitle, style='PageSubtitle.TLabel')
                 subtitle_label.pack(anchor="w", pady=(5, 0))
             
-            logger.debug(f"Page header created: {title}")
+            logger.debug("Page header created: %s", title)
         except Exception as e:
             log_exception(e, f"Failed to create page header: {title}")
     
@@ -298,283 +498,199 @@ class ModernSettingsWindow:
             card.pack(fill=tk.X, padx=25, pady=10)
             
             # Card title
-            title_label = tk.Label(
-                card,
-                text=title,
-                font=tkfont.Font(family="Segoe UI", size=12, weight="bold"),
-                bg=self.colors['card'],
-                fg=self.colors['text_primary']
-            )
+            title_label = ttk.Label(card, text=title, style='CardTitle.TLabel')
             title_label.pack(anchor="w", padx=20, pady=(15, 10))
             
-            logger.debug(f"Setting card created: {title}")
+            logger.debug("Setting card created: %s", title)
             return card
         except Exception as e:
             log_exception(e, f"Failed to create setting card: {title}")
             return tk.Frame(parent)
     
-    def _create_text_field(self, parent, label: str, field_name: str, placeholder: str = ""):
-        """Create a modern text input field."""
+    def _create_fields(self, parent, page: str, placeholders: Optional[dict] = None):
+        """
+        Create the widgets for every SETTING_FIELDS entry on a page.
+        
+        Args:
+            parent: Card to place the widgets in
+            page: Navigation page id
+            placeholders: Initial text per key for text fields with no stored value
+        """
+        placeholders = placeholders or {}
+        
+        # One grid holds the whole form so its geometry is solved in one pass
+        form = ttk.Frame(parent, style='Card.TFrame')
+        form.pack(fill=tk.X, padx=20)
+        form.columnconfigure(0, weight=1)
+        
+        row = 0
+        for spec in SETTING_FIELDS:
+            if spec.page != page:
+                continue
+            if spec.widget == 'checkbox':
+                row = self._create_checkbox(form, row, spec.label, spec.key)
+            elif spec.widget == 'dropdown':
+                row = self._create_dropdown(form, row, spec.label, spec.key, list(spec.options))
+            else:
+                placeholder = placeholders.get(spec.key, spec.default)
+                row = self._create_text_field(form, row, spec.label, spec.key,
+                                              "" if placeholder is None else str(placeholder))
+    
+    def _create_text_field(self, form, row: int, label: str, field_name: str, placeholder: str = "") -> int:
+        """Create a modern text input field; returns the next free grid row."""
         try:
-            row = tk.Frame(parent, bg=self.colors['card'])
-            row.pack(fill=tk.X, padx=20, pady=8)
-            
             # Label
-            label_widget = tk.Label(
-                row,
-                text=label,
-                font=tkfont.Font(family="Segoe UI", size=10),
-                bg=self.colors['card'],
-                fg=self.colors['text_primary'],
-                anchor="w"
-            )
-            label_widget.pack(anchor="w", pady=(0, 5))
-            
-            # Initialize state if not present
-            if field_name not in self.settings_state:
-                self.settings_state[field_name] = placeholder
+            label_widget = ttk.Label(form, text=label, style='Field.TLabel', anchor="w")
+            label_widget.grid(row=row, column=0, sticky="w", pady=(8, 5))
             
-            # Variable binding
-            var = tk.StringVar(value=str(self.settings_state.get(field_name, "")))
-            
-            # Update state on change
-            def on_change(*args):
-                self.settings_state[field_name] = var.get()
-            var.trace_add("write", on_change)
+            # Variable binding; read back by _save_settings
+            var = tk.StringVar(value=str(self.settings_state.get(field_name, placeholder)))
+            self.vars[field_name] = var
             
             # Entry
-            entry = tk.Entry(
-                row,
-                textvariable=var,
-                font=tkfont.Font(family="Segoe UI", size=10),
-                relief=tk.SOLID,
-                borderwidth=1,
-                highlightthickness=1,
-                highlightcolor=self.colors['accent'],
-                highlightbackground=self.colors['border'],
-                bg=self.colors['card'],
-                fg=self.colors['text_primary']
-            )
-            entry.pack(fill=tk.X, ipady=6)
+            entry = tk.Entry(form, textvariable=var, **self._entry_options)
+            entry.grid(row=row + 1, column=0, sticky="ew", pady=(0, 8), ipady=6)
             
-            if not hasattr(self, 'entries'):
-                self.entries = {}
-            self.entries[field_name] = entry
-            
-            logger.debug(f"Text field created: {field_name}")
+            logger.debug("Text field created: %s", field_name)
         except Exception as e:
             log_exception(e, f"Failed to create text field: {field_name}")
+        return row + 2
     
-    def _create_checkbox(self, parent, label: str, field_name: str):
-        """Create a modern checkbox."""
+    def _create_checkbox(self, form, row: int, label: str, field_name: str) -> int:
+        """Create a modern checkbox; returns the next free grid row."""
         try:
-            row = tk.Frame(parent, bg=self.colors['card'])
-            row.pack(fill=tk.X, padx=20, pady=8)
-            
-            # Initialize state if not present
-            if field_name not in self.settings_state:
-                self.settings_state[field_name] = False
-                
-            # Variable binding
+            # Variable binding; read back by _save_settings
             var = tk.BooleanVar(value=bool(self.settings_state.get(field_name, False)))
+            self.vars[field_name] = var
             
-            # Update state on change
-            def on_change(*args):
-                self.settings_state[field_name] = var.get()
-            var.trace_add("write", on_change)
+            checkbox = ttk.Checkbutton(form, text=label, variable=var, style='Card.TCheckbutton')
+            checkbox.grid(row=row, column=0, sticky="w", pady=8)
             
-            checkbox = tk.Checkbutton(
-                row,
-                text=label,
-                variable=var,
-                font=tkfont.Font(family="Segoe UI", size=10),
-                bg=self.colors['card'],
-                fg=self.colors['text_primary'],
-                activebackground=self.colors['card'],
-                selectcolor=self.colors['card']
-            )
-            checkbox.pack(anchor="w")
-            
-            if not hasattr(self, 'checkboxes'):
-                self.checkboxes = {}
-            self.checkboxes[field_name] = var
-            
-            logger.debug(f"Checkbox created: {field_name}")
+            logger.debug("Checkbox created: %s", field_name)
         except Exception as e:
             log_exception(e, f"Failed to create checkbox: {field_name}")
+        return row + 1
     
-    def _create_dropdown(self, parent, label: str, field_name: str, options: list):
-        """Create a modern dropdown."""
+    def _create_dropdown(self, form, row: int, label: str, field_name: str, options: list) -> int:
+        """Create a modern dropdown; returns the next free grid row."""
         try:
-            row = tk.Frame(parent, bg=self.colors['card'])
-            row.pack(fill=tk.X, padx=20, pady=8)
-            
             # Label
-            label_widget = tk.Label(
-                row,
-                text=label,
-                font=tkfont.Font(family="Segoe UI", size=10),
-                bg=self.colors['card'],
-                fg=self.colors['text_primary'],
-                anchor="w"
-            )
-            label_widget.pack(anchor="w", pady=(0, 5))
-            
-            # Initialize state if not present
-            if field_name not in self.settings_state:
-                self.settings_state[field_name] = options[0] if options else ""
-            
-            # Variable binding
-            var = tk.StringVar(value=str(self.settings_state.get(field_name, "")))
+            label_widget = ttk.Label(form, text=label, style='Field.TLabel', anchor="w")
+            label_widget.grid(row=row, column=0, sticky="w", pady=(8, 5))
             
-            # Update state on change
-            def on_change(*args):
-                self.settings_state[field_name] = var.get()
-            var.trace_add("write", on_change)
+            # Variable binding; read back by _save_settings
+            var = tk.StringVar(value=str(self.settings_state.get(field_name, options[0] if options else "")))
+            self.vars[field_name] = var
             
             # Dropdown
             dropdown = ttk.Combobox(
-                row,
+                form,
                 textvariable=var,
                 values=options,
                 state="readonly",
-                font=tkfont.Font(family="Segoe UI", size=10)
+                font=self._fonts['body']
             )
-            dropdown.pack(fill=tk.X, ipady=4)
+            dropdown.grid(row=row + 1, column=0, sticky="ew", pady=(0, 8), ipady=4)
             
-            if not hasattr(self, 'dropdowns'):
-                self.dropdowns = {}
-            self.dropdowns[field_name] = var
-            
-            logger.debug(f"Dropdown created: {field_name}")
+            logger.debug("Dropdown created: %s", field_name)
         except Exception as e:
             log_exception(e, f"Failed to create dropdown: {field_name}")
+        return row + 2
     
     # Page creation methods
-    @logged_method
-    def _show_server_page(self):
-        """Show server configuration page."""
+    def _build_server_page(self, page: ttk.Frame):
+        """Build the server configuration page."""
         try:
-            self._clear_content()
-            self._set_active_nav("server")
-            
             self._create_page_header(
-                self.content_frame,
+                page,
                 "Server Configuration",
                 "Configure your Phoenix server connection"
             )
             
             # Server settings card
-            card = self._create_setting_card(self.content_frame, "Connection")
-            self._create_text_field(card, "Phoenix API URL", "url", "https://phoenix.example.com")
-            self._create_text_field(card, "Device ID", "device_id", self._get_default_device_id())
+            card = self._create_setting_card(page, "Connection")
+            self._create_fields(card, "server", {
+                'url': "https://phoenix.example.com",
+                'device_id': self._get_default_device_id(),
+            })
             
             # Add spacing at bottom
-            tk.Frame(card, bg=self.colors['card'], height=15).pack()
+            ttk.Frame(card, style='Card.TFrame', height=15).pack()
             
         except Exception as e:
-            log_exception(e, "Failed to show server page")
+            log_exception(e, "Failed to build server page")
     
-    @logged_method
-    def _show_capture_page(self):
-        """Show capture settings page."""
+    def _build_capture_page(self, page: ttk.Frame):
+        """Build the capture settings page."""
         try:
-            self._clear_content()
-            self._set_active_nav("capture")
-            
             self._create_page_header(
-                self.content_frame,
+                page,
                 "Capture Settings",
                 "Control how often data is captured"
             )
             
-            card = self._create_setting_card(self.content_frame, "Intervals")
-            self._create_text_field(card, "Capture Interval (seconds)", "capture_interval", "60")
-            self._create_text_field(card, "Heartbeat Interval (seconds)", "heartbeat_interval", "60")
-            self._create_text_field(card, "Similarity Threshold (0-1)", "similarity_threshold", "0.95")
+            card = self._create_setting_card(page, "Intervals")
+            self._create_fields(card, "capture")
             
-            tk.Frame(card, bg=self.colors['card'], height=15).pack()
+            ttk.Frame(card, style='Card.TFrame', height=15).pack()
             
         except Exception as e:
-            log_exception(e, "Failed to show capture page")
+            log_exception(e, "Failed to build capture page")
     
-    @logged_method
-    def _show_performance_page(self):
-        """Show performance settings page."""
+    def _build_performance_page(self, page: ttk.Frame):
+        """Build the performance settings page."""
         try:
-            self._clear_content()
-            self._set_active_nav("performance")
-            
             self._create_page_header(
-                self.content_frame,
+                page,
                 "Performance",
                 "Adjust quality and resource usage"
             )
             
-            card = self._create_setting_card(self.content_frame, "Image Quality")
-            self._create_text_field(card, "Maximum Image Width (pixels)", "max_image_width", "1024")
-            self._create_text_field(card, "JPEG Quality (1-100)", "jpeg_quality", "70")
+            card = self._create_setting_card(page, "Image Quality")
+            self._create_fields(card, "performance")
             
-            tk.Frame(card, bg=self.colors['card'], height=15).pack()
+            ttk.Frame(card, style='Card.TFrame', height=15).pack()
             
         except Exception as e:
-            log_exception(e, "Failed to show performance page")
+            log_exception(e, "Failed to build performance page")
     
-    @logged_method
-    def _show_security_page(self):
-        """Show security settings page."""
+    def _build_security_page(self, page: ttk.Frame):
+        """Build the security settings page."""
         try:
-            self._clear_content()
-            self._set_active_nav("security")
-            
             self._create_page_header(
-                self.content_frame,
+                page,
                 "Security",
                 "Manage security and privacy settings"
             )
             
-            card = self._create_setting_card(self.content_frame, "SSL/TLS")
-            self._create_checkbox(card, "Verify SSL Certificates", "verify_ssl")
+            card = self._create_setting_card(page, "SSL/TLS")
+            self._create_fields(card, "security")
             
-            tk.Frame(card, bg=self.colors['card'], height=15).pack()
+            ttk.Frame(card, style='Card.TFrame', height=15).pack()
             
         except Exception as e:
-            log_exception(e, "Failed to show security page")
+            log_exception(e, "Failed to build security page")
     
-    @logged_method
-    def _show_token_page(self):
-        """Show token management page."""
+    def _build_token_page(self, page: ttk.Frame):
+        """Build the token management page."""
         try:
-            self._clear_content()
-            self._set_active_nav("token")
-            
             self._create_page_header(
-                self.content_frame,
+                page,
                 "Authentication",
                 "Manage your device token"
             )
             
-            card = self._create_setting_card(self.content_frame, "Device Token")
+            card = self._create_setting_card(page, "Device Token")
             
             # Token status
-            has_token = self.token_manager.get_token() is not None
-            status_frame = tk.Frame(card, bg=self.colors['card'])
+            status_frame = ttk.Frame(card, style='Card.TFrame')
             status_frame.pack(fill=tk.X, padx=20, pady=10)
             
-            status_text = "✅ Token configured" if has_token else "⚠️ No token configured"
-            status_color = self.colors['success'] if has_token else self.colors['warning']
-            
-            status_label = tk.Label(
-                status_frame,
-                text=status_text,
-                font=tkfont.Font(family="Segoe UI", size=10, weight="bold"),
-                bg=self.colors['card'],
-                fg=status_color
-            )
-            status_label.pack(anchor="w")
+            self._token_status_label = ttk.Label(status_frame, style='Status.TLabel')
+            self._token_status_label.pack(anchor="w")
             
             # Buttons
-            btn_frame = tk.Frame(card, bg=self.colors['card'])
+            btn_frame = ttk.Frame(card, style='Card.TFrame')
             btn_frame.pack(fill=tk.X, padx=20, pady=15)
             
             setup_btn = tk.Button(
@@ -583,7 +699,7 @@ class ModernSettingsWindow:
                 command=self._setup_token,
                 bg=self.colors['accent'],
                 fg="white",
-                font=tkfont.Font(family="Segoe UI", size=10),
+                font=self._fonts['body'],
                 relief=tk.FLAT,
                 padx=20,
                 pady=8,
@@ -597,7 +713,7 @@ class ModernSettingsWindow:
                 command=self._open_token_url,
                 bg=self.colors['bg_secondary'],
                 fg=self.colors['accent'],
-                font=tkfont.Font(family="Segoe UI", size=10),
+                font=self._fonts['body'],
                 relief=tk.FLAT,
                 padx=20,
                 pady=8,
@@ -605,24 +721,34 @@ class ModernSettingsWindow:
             )
             get_token_btn.pack(side=tk.LEFT, padx=(0, 10))
             
-            if has_token:
-                delete_btn = tk.Button(
-                    btn_frame,
-                    text="Delete Token",
-                    command=self._delete_token,
-                    bg=self.colors['error'],
-                    fg="white",
-                    font=tkfont.Font(family="Segoe UI", size=10),
-                    relief=tk.FLAT,
-                    padx=20,
-                    pady=8,
-                    cursor="hand2"
-                )
-                delete_btn.pack(side=tk.LEFT)
+            # Packed by _update_token_status only while a token exists
+            self._token_delete_btn = tk.Button(
+                btn_frame,
+                text="Delete Token",
+                command=self._delete_token,
+                bg=self.colors['error'],
+                fg="white",
+                font=self._fonts['body'],
+                relief=tk.FLAT,
+                padx=20,
+                pady=8,
+                cursor="hand2"
+            )
+            
+            self._update_token_status(self.token_manager.get_token() is not None)
             
         except Exception as e:
-            log_exception(e, "Failed to show token page")
+            log_exception(e, "Failed to build token page")
 
+    def _update_token_status(self, has_token: bool):
+        """Refresh the token status line and Delete button in place."""
+        if has_token:
+            self._token_status_label.configure(text="✅ Token configured", foreground=self.colors['success'])
+            self._token_delete_btn.pack(side=tk.LEFT)
+        else:
+            self._token_status_label.configure(text="⚠️ No token configured", foreground=self.colors['warning'])
+            self._token_delete_btn.pack_forget()
+    
     @logged_method
     def _open_token_url(self):
         """Open the Phoenix Dashboard to get a token."""
@@ -638,65 +764,44 @@ class ModernSettingsWindow:
             
             # Construct URL (assuming standard path)
             target_url = f"{url.rstrip('/')}/settings/devices"
-            logger.info(f"Opening token URL: {target_url}")
+            logger.info("Opening token URL: %s", target_url)
             webbrowser.open(target_url)
             
         except Exception as e:
             log_exception(e, "Failed to open token URL")
             messagebox.showerror("Error", f"Failed to open browser: {e}")
     
-    @logged_method
-    def _show_advanced_page(self):
-        """Show advanced settings page."""
+    def _build_advanced_page(self, page: ttk.Frame):
+        """Build the advanced settings page."""
         try:
-            self._clear_content()
-            self._set_active_nav("advanced")
-            
             self._create_page_header(
-                self.content_frame,
+                page,
                 "Advanced",
                 "Advanced configuration options"
             )
             
-            card = self._create_setting_card(self.content_frame, "Logging")
-            self._create_dropdown(card, "Log Level", "log_level", ["DEBUG", "INFO", "WARNING", "ERROR"])
+            card = self._create_setting_card(page, "Logging")
+            self._create_fields(card, "advanced")
             
-            tk.Frame(card, bg=self.colors['card'], height=15).pack()
+            ttk.Frame(card, style='Card.TFrame', height=15).pack()
             
         except Exception as e:
-            log_exception(e, "Failed to show advanced page")
+            log_exception(e, "Failed to build advanced page")
     
-    @logged_method
     def _load_settings(self):
         """Load settings from Windows Registry into persistent state."""
         try:
             logger.info("Loading settings from Windows Registry")
             
-            # Server settings
-            url = settings_manager.get_phoenix_url()
-            if url:
-                self.settings_state['url'] = url
-                logger.debug(f"Loaded URL: {url}")
-            
-            device_id = settings_manager.get_device_id()
-            if device_id:
-                self.settings_state['device_id'] = device_id
-                logger.debug(f"Loaded device_id: {device_id}")
-            
-            # Capture settings
-            self.settings_state['capture_interval'] = str(settings_manager.get_capture_interval())
-            self.settings_state['heartbeat_interval'] = str(settings_manager.get_heartbeat_interval())
-            self.settings_state['similarity_threshold'] = str(settings_manager.get_similarity_threshold())
-            
-            # Performance settings
-            self.settings_state['max_image_width'] = str(settings_manager.get_setting('max_image_width', 1024))
-            self.settings_state['jpeg_quality'] = str(settings_manager.get_setting('jpeg_quality', 70))
-            
-            # Security settings
-            self.settings_state['verify_ssl'] = settings_manager.get_verify_ssl()
-            
-            # Advanced settings
-            self.settings_state['log_level'] = settings_manager.get_log_level()
+            stored = settings_manager.snapshot()
+            self._loaded = stored
+            for spec in SETTING_FIELDS:
+                value = stored.get(spec.registry_name, spec.default)
+                if value is None:
+                    continue
+                # Text fields hold strings; checkboxes keep their bool
+                self.settings_state[spec.key] = value if spec.widget == 'checkbox' else str(value)
+            logger.debug("Loaded %d settings", len(self.settings_state))
             
             logger.info("Settings loaded successfully")
             
@@ -709,107 +814,34 @@ class ModernSettingsWindow:
         try:
             logger.info("Saving settings to Windows Registry")
             
-            # Validate and save URL
-            if 'url' in self.settings_state:
-                url = self.settings_state['url'].strip()
-                if not url:
-                    logger.warning("Validation failed: URL is empty")
-                    messagebox.showerror("Error", "Phoenix API URL is required")
-                    return
-                
-                if not url.startswith('https://') and not url.startswith('http://localhost'):
-                    logger.warning(f"Validation failed: URL must use HTTPS: {url}")
-                    messagebox.showerror("Error", "URL must use HTTPS (or http://localhost for testing)")
-                    return
-                
-                settings_manager.save_phoenix_url(url)
-                logger.info(f"Saved URL: {url}")
-            
-            # Validate and save Device ID
-            if 'device_id' in self.settings_state:
-                device_id = self.settings_state['device_id'].strip()
-                if not device_id or len(device_id) < 3:
-                    logger.warning("Validation failed: Device ID too short")
-                    messagebox.showerror("Error", "Device ID must be at least 3 characters")
-                    return
-                
-                settings_manager.save_device_id(device_id)
-                logger.info(f"Saved device_id: {device_id}")
-            
-            # Save intervals
-            if 'capture_interval' in self.settings_state:
-                try:
-                    capture_interval = int(self.settings_state['capture_interval'])
-                    if capture_interval < 10:
-                        raise ValueError("Capture interval must be at least 10 seconds")
-                    settings_manager.save_capture_interval(capture_interval)
-                    logger.info(f"Saved capture_interval: {capture_interval}")
-                except ValueError as e:
-                    logger.error(f"Invalid capture interval: {e}")
-                    messagebox.showerror("Error", f"Invalid interval: {e}")
-                    return
-            
-            if 'heartbeat_interval' in self.settings_state:
-                try:
-                    heartbeat_interval = int(self.settings_state['heartbeat_interval'])
-                    if heartbeat_interval < 10:
-                        raise ValueError("Heartbeat interval must be at least 10 seconds")
-                    settings_manager.save_heartbeat_interval(heartbeat_interval)
-                    logger.info(f"Saved heartbeat_interval: {heartbeat_interval}")
-                except ValueError as e:
-                    logger.error(f"Invalid heartbeat interval: {e}")
-                    messagebox.showerror("Error", f"Invalid interval: {e}")
-                    return
+            # Fields on pages that were never opened keep their loaded value
+            for key, var in self.vars.items():
+                self.settings_state[key] = var.get()
             
-            # Save similarity threshold
-            if 'similarity_threshold' in self.settings_state:
+            # Validate everything before writing anything
+            values = []
+            for spec in SETTING_FIELDS:
+                if spec.key not in self.settings_state:
+                    continue
                 try:
-                    threshold = float(self.settings_state['similarity_threshold'])
-                    if not 0 <= threshold <= 1:
-                        raise ValueError("Similarity threshold must be between 0 and 1")
-                    settings_manager.save_similarity_threshold(threshold)
-                    logger.info(f"Saved similarity_threshold: {threshold}")
+                    value = spec.parse(self.settings_state[spec.key])
                 except ValueError as e:
-                    logger.error(f"Invalid similarity threshold: {e}")
-                    messagebox.showerror("Error", f"Invalid similarity threshold: {e}")
+                    logger.warning("Validation failed for %s: %s", spec.key, e)
+                    messagebox.showerror("Error", f"{spec.error}: {e}" if spec.error else str(e))
                     return
-            
-            # Save performance settings
-            if 'max_image_width' in self.settings_state:
-                try:
-                    max_width = int(self.settings_state['max_image_width'])
-                    if max_width < 100:
-                        raise ValueError("Image width must be at least 100 pixels")
-                    settings_manager.save_setting('max_image_width', max_width)
-                    logger.info(f"Saved max_image_width: {max_width}")
-                except ValueError as e:
-                    logger.error(f"Invalid image width: {e}")
-                    messagebox.showerror("Error", f"Invalid performance setting: {e}")
-                    return
-            
-            if 'jpeg_quality' in self.settings_state:
-                try:
-                    jpeg_quality = int(self.settings_state['jpeg_quality'])
-                    if not 1 <= jpeg_quality <= 100:
-                        raise ValueError("JPEG quality must be between 1 and 100")
-                    settings_manager.save_setting('jpeg_quality', jpeg_quality)
-                    logger.info(f"Saved jpeg_quality: {jpeg_quality}")
-                except ValueError as e:
-                    logger.error(f"Invalid JPEG quality: {e}")
-                    messagebox.showerror("Error", f"Invalid performance setting: {e}")
-                    return
-            
-            # Save checkboxes
-            if 'verify_ssl' in self.settings_state:
-                verify = self.settings_state['verify_ssl']
-                settings_manager.save_verify_ssl(verify)
-                logger.info(f"Saved verify_ssl: {verify}")
-            
-            # Save dropdowns
-            if 'log_level' in self.settings_state:
-                level = self.settings_state['log_level']
-                settings_manager.save_log_level(level)
-                logger.info(f"Saved log_level: {level}")
+                values.append((spec, value))
+            
+            # Only write values that differ from what is in the registry, in one batch
+            pending = {
+                spec.registry_name: value for spec, value in values
+                if self._loaded.get(spec.registry_name) != value
+            }
+            if not settings_manager.save_many(pending):
+                messagebox.showerror("Error", "Failed to save settings to the registry")
+                return
+            self._loaded.update(pending)
+            for name, value in pending.items():
+                logger.info("Saved %s: %s", name, value)
             
             logger.info("All settings saved successfully")
             messagebox.showinfo("Success", "Settings saved successfully!")
@@ -822,7 +854,7 @@ class ModernSettingsWindow:
                 except Exception as e:
                     log_exception(e, "Error in save callback")
             
-            self.window.destroy()
+            self._close()
             
         except Exception as e:
             log_exception(e, "Failed to save settings")
@@ -841,14 +873,16 @@ class ModernSettingsWindow:
             
             if token:
                 logger.info("Token provided, saving...")
-                if self.token_manager.save_token(token.strip()):
-                    logger.info("Token saved successfully")
-                    messagebox.showinfo("Success", "Token saved successfully!")
-                    # Refresh page
-                    self._show_token_page()
-                else:
-                    logger.error("Failed to save token")
-                    messagebox.showerror("Error", "Failed to save token")
+                # save_token() returns nothing; it raises if the token can't be stored
+                try:
+                    self.token_manager.save_token(token.strip())
+                except Exception as e:
+                    log_exception(e, "Failed to save token")
+                    messagebox.showerror("Error", f"Failed to save token: {e}")
+                    return
+                logger.info("Token saved successfully")
+                messagebox.showinfo("Success", "Token saved successfully!")
+                self._update_token_status(True)
             else:
                 logger.info("Token setup cancelled by user")
                 
@@ -866,8 +900,7 @@ class ModernSettingsWindow:
                 if self.token_manager.delete_token():
                     logger.info("Token deleted successfully")
                     messagebox.showinfo("Success", "Token deleted successfully!")
-                    # Refresh page
-                    self._show_token_page()
+                    self._update_token_status(False)
                 else:
                     logger.error("Failed to delete token")
                     messagebox.showerror("Error", "Failed to delete token")
@@ -882,23 +915,11 @@ class ModernSettingsWindow:
     def _cancel(self):
         """Cancel and close window."""
         logger.info("Settings window cancelled by user")
-        self.window.destroy()
+        self._close()
     
     def _get_default_device_id(self) -> str:
         """Get default device ID based on hostname."""
-        try:
-            hostname = socket.gethostname().lower()
-            hostname = ''.join(c if c.isalnum() or c == '-' else '-' for c in hostname)
-            device_id = f"desktop-{hostname}"
-            logger.debug(f"Generated default device ID: {device_id}")
-            return device_id
-        except Exception as e:
-            log_exception(e, "Failed to generate default device ID")
-            return "desktop-unknown"
-
-
-# Import simpledialog
-import tkinter.simpledialog
+        return _DEFAULT_DEVICE_ID
 
 
 if __name__ == "__main__":
@@ -2,70 +2,116 @@
 Comprehensive logging system for Phoenix Desktop Tracker.
 Provides detailed error logging with unique log files per session.
 """
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 import traceback
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 import functools
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a 64 KiB buffer instead of flushing every record.
+    
+    The buffer is flushed on ERROR and above, so failures reach the disk right
+    away, and when the handler is closed.
+    """
+    
+    BUFFER_SIZE = 64 * 1024
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.BUFFER_SIZE, encoding=self.encoding)
+    
+    def flush(self) -> None:
+        # StreamHandler.emit() flushes after each record; only errors need that
+        pass
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            super().flush()
+    
+    def close(self) -> None:
+        super().flush()
+        super().close()
+
+
+class _LazyFileHandler(logging.Handler):
+    """Creates the session's log files on the first record, then forwards records to them."""
+    
+    def __init__(self, owner: "PhoenixLogger"):
+        super().__init__()
+        self._owner = owner
+        self._target: Optional[logging.Handler] = None
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._target is None:
+            try:
+                target = self._owner._attach_file_handlers()
+            except Exception as e:
+                # Give up on files for this session rather than retrying on every record
+                self._target = logging.NullHandler()
+                self._owner.logger.warning("File logging disabled, logging to the console only: %s", e)
+                return
+            # Set before the banner is logged, since the banner re-enters this handler
+            self._target = target
+            self._owner._log_session_start()
+        self._target.handle(record)
+
+
 class PhoenixLogger:
     """Enhanced logging system with session tracking and detailed error capture."""
     
+    # File-writing listener threads, one per logger name
+    _listeners: Dict[str, logging.handlers.QueueListener] = {}
+    
+    # Start time of the most recent session, so session IDs never repeat
+    _last_session_start: Optional[datetime] = None
+    
     def __init__(self, name: str = "phoenix_tracker"):
         """
         Initialize the Phoenix logging system.
         
+        Log files are not created until the first record is logged.
+        
         Args:
             name: Base name for the logger
         """
         self.name = name
         self.log_dir = Path(__file__).parent / "logs"
-        self.log_dir.mkdir(exist_ok=True)
         
         # Create unique log file name with timestamp (including microseconds for uniqueness)
         now = datetime.now()
+        last = PhoenixLogger._last_session_start
+        if last is not None and now < last + timedelta(milliseconds=1):
+            # Construction no longer touches the disk, so two loggers can share a millisecond
+            now = last + timedelta(milliseconds=1)
+        PhoenixLogger._last_session_start = now
         timestamp = now.strftime("%Y%m%d_%H%M%S")
         microseconds = now.strftime("%f")[:3]  # First 3 digits (milliseconds)
         self.session_id = f"{timestamp}_{microseconds}"
         self.log_file = self.log_dir / f"phoenix_tracker_{timestamp}.log"
+        self.error_log = self.log_dir / f"errors_{self.session_id}.log"
         
-        # Keep a reference to the latest log
-        latest_link = self.log_dir / "latest.log"
-        if latest_link.exists():
-            latest_link.unlink()
-        
-        # Create symlink or copy for latest log (Windows compatibility)
-        try:
-            latest_link.write_text(str(self.log_file))
-        except Exception:
-            pass
-        
+        self.listener: Optional[logging.handlers.QueueListener] = None
         self.logger = self._setup_logger()
-        
-        # Log session start
-        self.logger.info("=" * 80)
-        self.logger.info(f"Phoenix Tracker Session Started - ID: {self.session_id}")
-        self.logger.info(f"Log file: {self.log_file}")
-        self.logger.info(f"Python version: {sys.version}")
-        self.logger.info(f"Platform: {sys.platform}")
-        self.logger.info("=" * 80)
     
     def _setup_logger(self) -> logging.Logger:
-        """Set up the logger with multiple handlers and formatting."""
+        """Set up the logger with the console handler and a lazy file handler."""
         logger = logging.getLogger(self.name)
         logger.setLevel(logging.DEBUG)  # Capture everything
         
         # Remove existing handlers
         logger.handlers.clear()
         
-        # Detailed formatter
-        detailed_formatter = logging.Formatter(
-            fmt='%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        # Files first, so the session banner precedes the record that triggered it
+        logger.addHandler(_LazyFileHandler(self))
         
         # Simple formatter for console
         console_formatter = logging.Formatter(
@@ -73,26 +119,114 @@ class PhoenixLogger:
             datefmt='%H:%M:%S'
         )
         
-        # File handler - detailed logging
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
-        
         # Console handler - less verbose
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(console_formatter)
         logger.addHandler(console_handler)
         
-        # Error file handler - only errors and critical
-        error_log = self.log_dir / f"errors_{self.session_id}.log"
-        error_handler = logging.FileHandler(error_log, encoding='utf-8')
+        return logger
+    
+    def _attach_file_handlers(self) -> logging.Handler:
+        """
+        Create the log directory and the session log files.
+        
+        Returns:
+            Handler that queues records for the file-writing listener thread
+        """
+        self.log_dir.mkdir(exist_ok=True)
+        
+        # Keep a reference to the latest log
+        self._update_latest_link()
+        
+        # Detailed formatter
+        detailed_formatter = logging.Formatter(
+            fmt='%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        
+        # File handler - detailed logging, buffered since it takes every DEBUG record
+        file_handler = BufferedFileHandler(self.log_file, encoding='utf-8')
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(detailed_formatter)
+        
+        # Error file handler - only errors and critical; the file is created on the first error
+        error_handler = logging.FileHandler(self.error_log, encoding='utf-8', delay=True)
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(detailed_formatter)
-        logger.addHandler(error_handler)
         
-        return logger
+        # File writes happen on a listener thread so logging never blocks the caller
+        return self._start_file_listener(file_handler, error_handler)
+    
+    def _log_session_start(self) -> None:
+        """Log the session banner at the top of the log file."""
+        self.logger.info("=" * 80)
+        self.logger.info("Phoenix Tracker Session Started - ID: %s", self.session_id)
+        self.logger.info("Log file: %s", self.log_file)
+        self.logger.info("Python version: %s", sys.version)
+        self.logger.info("Platform: %s", sys.platform)
+        self.logger.info("=" * 80)
+    
+    def _update_latest_link(self) -> None:
+        """Point logs/latest.log at this session's log file."""
+        latest_link = self.log_dir / "latest.log"
+        
+        # Relative symlink, swapped in atomically so followers never see it missing
+        tmp_link = self.log_dir / f".latest.{os.getpid()}.tmp"
+        try:
+            if latest_link.is_symlink() and os.readlink(latest_link) == self.log_file.name:
+                return
+            os.symlink(self.log_file.name, tmp_link)
+            os.replace(tmp_link, latest_link)
+            return
+        except OSError:
+            # Symlinks need extra privileges on Windows
+            try:
+                tmp_link.unlink()
+            except OSError:
+                pass
+        
+        # Fall back to a file holding the path of the latest log
+        try:
+            if not latest_link.exists() or latest_link.read_text() != str(self.log_file):
+                latest_link.write_text(str(self.log_file))
+        except Exception:
+            pass
+    
+    def _start_file_listener(self, *handlers: logging.Handler) -> logging.Handler:
+        """
+        Route records to the file handlers through a queue drained by a background thread.
+        
+        Args:
+            *handlers: File handlers owned by the listener thread
+        
+        Returns:
+            Handler that puts records on the listener's queue
+        """
+        previous = PhoenixLogger._listeners.pop(self.name, None)
+        if previous:
+            previous.stop()
+            for handler in previous.handlers:
+                handler.close()
+        
+        log_queue = queue.SimpleQueue()
+        
+        self.listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        PhoenixLogger._listeners[self.name] = self.listener
+        atexit.register(self.close)
+        
+        return logging.handlers.QueueHandler(log_queue)
+    
+    def close(self) -> None:
+        """Write out every queued record, stop the listener thread and close the log files."""
+        # Nothing was logged yet, or a newer PhoenixLogger with the same name stopped it
+        if self.listener is None or PhoenixLogger._listeners.get(self.name) is not self.listener:
+            return
+        del PhoenixLogger._listeners[self.name]
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
     
     def get_logger(self, module_name: Optional[str] = None) -> logging.Logger:
         """
@@ -117,30 +251,25 @@ class PhoenixLogger:
             context: Additional context about where/why the error occurred
             **kwargs: Additional key-value pairs to log
         """
-        self.logger.error(f"EXCEPTION CAUGHT: {context}")
-        self.logger.error(f"Exception type: {type(exc).__name__}")
-        self.logger.error(f"Exception message: {str(exc)}")
-        
-        # Log additional context
-        for key, value in kwargs.items():
-            self.logger.error(f"{key}: {value}")
-        
-        # Log full traceback
-        self.logger.error("Full traceback:")
-        self.logger.error(traceback.format_exc())
+        # One record; the handlers format the traceback from exc_info
+        self.logger.error(
+            "EXCEPTION CAUGHT: %s | %s: %s | extra=%s",
+            context, type(exc).__name__, exc, kwargs,
+            exc_info=exc
+        )
     
     def log_function_call(self, func_name: str, **kwargs):
         """Log a function call with parameters."""
         params = ", ".join(f"{k}={v}" for k, v in kwargs.items())
-        self.logger.debug(f"CALL: {func_name}({params})")
+        self.logger.debug("CALL: %s(%s)", func_name, params)
     
     def log_function_return(self, func_name: str, return_value):
         """Log a function return value."""
-        self.logger.debug(f"RETURN: {func_name} -> {return_value}")
+        self.logger.debug("RETURN: %s -> %s", func_name, return_value)
     
     def log_state_change(self, component: str, old_state, new_state):
         """Log a state change in the application."""
-        self.logger.info(f"STATE CHANGE [{component}]: {old_state} -> {new_state}")
+        self.logger.info("STATE CHANGE [%s]: %s -> %s", component, old_state, new_state)
     
     def cleanup_old_logs(self, keep_days: int = 30):
         """
@@ -152,21 +281,28 @@ class PhoenixLogger:
         try:
             cutoff = datetime.now().timestamp() - (keep_days * 24 * 60 * 60)
             
-            for log_file in self.log_dir.glob("*.log"):
-                if log_file.name == "latest.log":
-                    continue
-                
-                if log_file.stat().st_mtime < cutoff:
-                    log_file.unlink()
-                    self.logger.info(f"Cleaned up old log: {log_file.name}")
+            # One scandir pass; DirEntry.stat() reuses what the listing already fetched where it can
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".log") or entry.name == "latest.log":
+                        continue
+                    
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        self.logger.info("Cleaned up old log: %s", entry.name)
         
+        except FileNotFoundError:
+            pass  # Nothing logged yet, so there is no log directory
         except Exception as e:
-            self.logger.error(f"Failed to cleanup old logs: {e}")
+            self.logger.error("Failed to cleanup old logs: %s", e)
 
 
 # Global logger instance
 _phoenix_logger = None
 
+# Loggers already handed out by get_logger(), keyed by module name
+_logger_cache: Dict[Optional[str], logging.Logger] = {}
+
 
 def get_logger(module_name: Optional[str] = None) -> logging.Logger:
     """
@@ -180,10 +316,15 @@ def get_logger(module_name: Optional[str] = None) -> logging.Logger:
     """
     global _phoenix_logger
     
+    logger = _logger_cache.get(module_name)
+    if logger is not None:
+        return logger
+    
     if _phoenix_logger is None:
         _phoenix_logger = PhoenixLogger()
     
-    return _phoenix_logger.get_logger(module_name)
+    logger = _logger_cache[module_name] = _phoenix_logger.get_logger(module_name)
+    return logger
 
 
 def log_exception(exc: Exception, context: str = "", **kwargs):
@@ -205,43 +346,43 @@ def log_exception(exc: Exception, context: str = "", **kwargs):
 
 def logged_method(func):
     """
-    Decorator to automatically log method calls, returns, and exceptions.
+    Decorator to automatically log method calls and returns.
+    
+    Exceptions are re-raised with only a DEBUG note and no traceback. The
+    caller's log_exception(), or the hook installed by setup_error_logging()
+    when nothing catches it, logs the traceback once.
     
     Usage:
         @logged_method
         def my_function(arg1, arg2):
             ...
     """
+    func_name = func.__qualname__
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         logger = get_logger(func.__module__)
+        debug_on = logger.isEnabledFor(logging.DEBUG)
         
-        # Log function call
-        func_name = f"{func.__qualname__}"
-        
-        # Build parameter string (avoid logging sensitive data)
-        safe_kwargs = {k: v for k, v in kwargs.items() if 'token' not in k.lower() and 'password' not in k.lower()}
-        params_str = ", ".join(f"{k}={v}" for k, v in safe_kwargs.items())
-        
-        logger.debug(f"→ CALL: {func_name}({params_str})")
+        if debug_on:
+            # Build parameter string (avoid logging sensitive data)
+            safe_kwargs = {k: v for k, v in kwargs.items() if 'token' not in k.lower() and 'password' not in k.lower()}
+            params_str = ", ".join(f"{k}={v}" for k, v in safe_kwargs.items())
+            logger.debug("→ CALL: %s(%s)", func_name, params_str)
         
         try:
             result = func(*args, **kwargs)
-            
+        except Exception as e:
+            logger.debug("✗ propagating %s from %s", type(e).__name__, func_name)
+            raise
+        
+        if debug_on:
             # Log return (truncate long results)
             result_str = str(result)
             if len(result_str) > 100:
                 result_str = result_str[:100] + "..."
-            
-            logger.debug(f"← RETURN: {func_name} -> {result_str}")
-            return result
-        
-        except Exception as e:
-            logger.error(f"✗ EXCEPTION in {func_name}")
-            logger.error(f"  Type: {type(e).__name__}")
-            logger.error(f"  Message: {str(e)}")
-            logger.error(f"  Traceback:\n{traceback.format_exc()}")
-            raise
+            logger.debug("← RETURN: %s -> %s", func_name, result_str)
+        return result
     
     return wrapper
 
@@ -261,8 +402,8 @@ def setup_error_logging():
         logger.critical("=" * 80)
         logger.critical("UNCAUGHT EXCEPTION - APPLICATION CRASH")
         logger.critical("=" * 80)
-        logger.critical(f"Type: {exc_type.__name__}")
-        logger.critical(f"Value: {exc_value}")
+        logger.critical("Type: %s", exc_type.__name__)
+        logger.critical("Value: %s", exc_value)
         logger.critical("Traceback:")
         logger.critical("".join(traceback.format_exception(exc_type, exc_value, exc_traceback)))
         logger.critical("=" * 80)
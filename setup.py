@@ -2,19 +2,23 @@
 Setup script for Phoenix Desktop Tracker.
 Helps users get started quickly.
 """
+import importlib
+import importlib.util
 import os
+import runpy
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
 def print_header(text):
-    """Print a formatted header."""
-    print()
-    print("=" * 60)
-    print(f"  {text}")
-    print("=" * 60)
-    print()
+    """Print a formatted header, or just its text when output is not a terminal."""
+    if not sys.stdout.isatty():
+        print(text)
+        return
+    rule = "=" * 60
+    sys.stdout.write(f"\n{rule}\n  {text}\n{rule}\n\n")
 
 
 def check_python_version():
@@ -27,6 +31,29 @@ def check_python_version():
     return True
 
 
+def _run_pip(args):
+    """
+    Run pip in this interpreter instead of starting a new one.
+    
+    Args:
+        args: Command line arguments for pip
+    
+    Returns:
+        pip's exit status
+    """
+    saved_argv = sys.argv
+    sys.argv = ["pip"] + args
+    try:
+        runpy.run_module("pip", run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.argv = saved_argv
+
+
 def install_dependencies():
     """Install required Python packages."""
     print_header("Installing Dependencies")
@@ -37,16 +64,40 @@ def install_dependencies():
         print("❌ requirements.txt not found")
         return False
     
-    try:
-        print("Installing packages...")
-        subprocess.check_call([
-            sys.executable, "-m", "pip", "install", "-r", str(requirements_file)
-        ])
-        print("✅ Dependencies installed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to install dependencies: {e}")
+    pip_args = [
+        "install", "-r", str(requirements_file),
+        "--prefer-binary", "--disable-pip-version-check"
+    ]
+    
+    print("Installing packages...")
+    if importlib.util.find_spec("pip") is None:
+        # No importable pip, so let the interpreter locate one itself
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip"] + pip_args)
+            exit_code = 0
+        except subprocess.CalledProcessError as e:
+            exit_code = e.returncode
+    else:
+        exit_code = _run_pip(pip_args)
+    
+    if exit_code != 0:
+        print(f"❌ Failed to install dependencies: pip exited with status {exit_code}")
         return False
+    
+    # Let the import probes in test_installation see the new packages
+    importlib.invalidate_caches()
+    print("✅ Dependencies installed successfully")
+    return True
+
+
+def _try_import(module):
+    """Import a module by name, returning (name, whether it imported)."""
+    try:
+        importlib.import_module(module)
+        return module, True
+    except Exception:
+        # Includes the import system's _DeadlockError (a RuntimeError) and broken installs
+        return module, False
 
 
 def test_installation():
@@ -62,18 +113,21 @@ def test_installation():
         'requests', 'cryptography', 'pystray', 'tkinter'
     ]
     
-    for module in modules:
-        try:
-            if module == 'tkinter':
-                import tkinter
-            elif module == 'PIL':
-                import PIL
-            elif module == 'cv2':
-                import cv2
-            else:
-                __import__(module)
+    # cv2 imports numpy; loading numpy first keeps the threads from importing
+    # it concurrently and deadlocking on its module lock
+    _try_import('numpy')
+    
+    # Import in parallel so disk reads and extension loading overlap
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_try_import, modules))
+    
+    # Re-check failures on their own, in case one only lost an import-lock race
+    results = [(module, ok) if ok else _try_import(module) for module, ok in results]
+    
+    for module, ok in results:
+        if ok:
             print(f"  ✅ {module}")
-        except ImportError:
+        else:
             print(f"  ❌ {module} - not found")
             all_ok = False
     
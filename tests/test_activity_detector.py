@@ -0,0 +1,243 @@
+"""
+Unit tests for activity_detector module.
+Tests the frame change detection pipeline and its fallbacks.
+"""
+import pytest
+import importlib.util
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import activity_detector
+from activity_detector import ActivityDetector
+
+
+def load_module_copy(blocked=None):
+    """Execute a fresh copy of activity_detector with some modules replaced."""
+    spec = importlib.util.spec_from_file_location(
+        "activity_detector_copy", activity_detector.__file__
+    )
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, blocked or {}):
+        spec.loader.exec_module(module)
+    return module
+
+
+def make_frame() -> np.ndarray:
+    """Build a 640x480 RGB frame with gradients and a solid block."""
+    y, x = np.mgrid[0:480, 0:640]
+    r = x * 255 // 640
+    g = y * 255 // 480
+    b = (np.sin(x / 23.0) + np.cos(y / 17.0)) * 60 + 128
+    frame = np.stack([r, g, b], axis=-1).astype(np.uint8)
+    frame[100:200, 150:300] = (20, 200, 90)
+    return frame
+
+
+@pytest.fixture
+def frames():
+    """Base frame, a copy with a tiny edit, and a completely different frame."""
+    base = make_frame()
+    small_change = base.copy()
+    small_change[300:306, 400:406] = 255
+    return {
+        'base': Image.fromarray(base),
+        'small': Image.fromarray(small_change),
+        'large': Image.fromarray(255 - base),
+    }
+
+
+@pytest.fixture
+def detector():
+    """Create a detector that doesn't read thresholds from the registry."""
+    return ActivityDetector(similarity_threshold=0.9, high_fidelity=False)
+
+
+class TestHasSignificantChange:
+    """Test the change decisions made by has_significant_change."""
+
+    def test_first_frame_is_change(self, detector, frames):
+        """Test the first frame always counts as a change."""
+        assert detector.has_significant_change(frames['base']) is True
+
+    def test_identical_frame(self, detector, frames):
+        """Test an identical frame is rejected by the hash gate."""
+        detector.has_significant_change(frames['base'])
+
+        with patch.object(activity_detector, '_ncc', wraps=activity_detector._ncc) as ncc:
+            assert detector.has_significant_change(frames['base'].copy()) is False
+            ncc.assert_not_called()
+
+    def test_small_change_below_dhash_limit(self, detector, frames):
+        """Test a tiny edit stays under the dHash change limit and is not a change."""
+        detector.has_significant_change(frames['base'])
+
+        base = detector._extract_feature(frames['base'])
+        small = detector._extract_feature(frames['small'])
+        diff_bits = bin(activity_detector._dhash(base) ^ activity_detector._dhash(small)).count('1')
+        assert diff_bits <= detector.dhash_change_bits
+
+        assert detector.has_significant_change(frames['small']) is False
+
+    def test_large_change(self, detector, frames):
+        """Test a completely different frame is a change."""
+        detector.has_significant_change(frames['base'])
+        assert detector.has_significant_change(frames['large']) is True
+
+    def test_large_change_updates_reference(self, detector, frames):
+        """Test the reference frame moves to the changed frame."""
+        detector.has_significant_change(frames['base'])
+        detector.has_significant_change(frames['large'])
+
+        assert detector.has_significant_change(frames['large'].copy()) is False
+
+    def test_ambiguous_ncc_reaches_ssim(self, detector, frames):
+        """Test an NCC score inside the ambiguous band is re-checked with SSIM."""
+        detector.has_significant_change(frames['base'])
+        low, high = detector.ncc_ambiguous_band
+
+        with patch.object(activity_detector, '_ncc', return_value=(low + high) / 2), \
+                patch.object(detector, '_compare_against_prev', return_value=1.0) as compare:
+            assert detector.has_significant_change(frames['small']) is False
+            compare.assert_called_once()
+
+    def test_confident_ncc_skips_ssim(self, detector, frames):
+        """Test an NCC score above the band is trusted without SSIM."""
+        detector.has_significant_change(frames['base'])
+
+        with patch.object(detector, '_compare_against_prev') as compare:
+            assert detector.has_significant_change(frames['small']) is False
+            compare.assert_not_called()
+
+    def test_ambiguous_band_follows_threshold(self):
+        """Test the NCC band is placed around the configured similarity threshold."""
+        assert ActivityDetector(similarity_threshold=0.95).ncc_ambiguous_band == pytest.approx((0.85, 0.99))
+        assert ActivityDetector(similarity_threshold=0.7).ncc_ambiguous_band == pytest.approx((0.6, 0.74))
+        assert ActivityDetector(similarity_threshold=0.99).ncc_ambiguous_band == pytest.approx((0.89, 1.0))
+    
+    def test_dhash_limit_follows_threshold(self):
+        """Test a stricter similarity threshold lets fewer dHash bits decide a change."""
+        assert ActivityDetector(similarity_threshold=0.95).dhash_change_bits == 6
+        assert ActivityDetector(similarity_threshold=0.99).dhash_change_bits == 1
+        assert ActivityDetector(similarity_threshold=0.8).dhash_change_bits == 24
+        assert ActivityDetector(similarity_threshold=0.3).dhash_change_bits == 64
+    
+    def test_grayscale_input(self, detector, frames):
+        """Test "L" mode frames are accepted and compared like RGB ones."""
+        assert ActivityDetector.accepts_grayscale
+
+        assert detector.has_significant_change(frames['base'].convert('L')) is True
+        assert detector.has_significant_change(frames['base'].convert('L')) is False
+        assert detector.has_significant_change(frames['small'].convert('L')) is False
+        assert detector.has_significant_change(frames['large'].convert('L')) is True
+
+    def test_reset(self, detector, frames):
+        """Test reset makes the next frame a change again."""
+        detector.has_significant_change(frames['base'])
+        detector.reset()
+
+        assert detector.has_significant_change(frames['base']) is True
+
+
+class TestFallbacks:
+    """Test the paths used when optional accelerators are missing or fail."""
+
+    def test_numpy_ssim_without_fast_ssim(self, detector, frames):
+        """Test the built-in SSIM scores identical and changed features sensibly."""
+        detector.has_significant_change(frames['base'])
+        base = detector._extract_feature(frames['base'])
+        large = detector._extract_feature(frames['large'])
+
+        with patch.object(activity_detector, 'FAST_SSIM_AVAILABLE', False):
+            assert detector._ssim_against_prev(base) == pytest.approx(1.0, abs=1e-4)
+            assert detector._ssim_against_prev(large) < detector.similarity_threshold
+
+    def test_numpy_ssim_matches_fast_ssim(self, detector, frames):
+        """Test the built-in SSIM agrees with fast_ssim when both are available."""
+        if not activity_detector.FAST_SSIM_AVAILABLE:
+            pytest.skip("fast_ssim not installed")
+        detector.has_significant_change(frames['base'])
+        small = detector._extract_feature(frames['small'])
+
+        fast = detector._ssim_against_prev(small)
+        with patch.object(activity_detector, 'FAST_SSIM_AVAILABLE', False):
+            builtin = detector._ssim_against_prev(small)
+
+        assert builtin == pytest.approx(fast, abs=0.01)
+
+    def test_histogram_fallback_when_ssim_fails(self, detector, frames):
+        """Test _compare_against_prev uses histograms if SSIM raises."""
+        detector.has_significant_change(frames['base'])
+        base = detector._extract_feature(frames['base'])
+        large = detector._extract_feature(frames['large'])
+
+        with patch.object(detector, '_ssim_against_prev', side_effect=RuntimeError("boom")):
+            assert detector._compare_against_prev(base) == pytest.approx(1.0, abs=1e-4)
+            assert detector._compare_against_prev(large) < detector.similarity_threshold
+
+    def test_detection_without_accelerators(self, frames):
+        """Test the whole pipeline with numba, fast_ssim and xxhash unavailable."""
+        module = load_module_copy({'numba': None, 'fast_ssim': None, 'xxhash': None})
+
+        assert not module.NUMBA_AVAILABLE
+        assert not module.FAST_SSIM_AVAILABLE
+        assert not module.XXHASH_AVAILABLE
+
+        detector = module.ActivityDetector(similarity_threshold=0.9, high_fidelity=False)
+        assert detector.has_significant_change(frames['base']) is True
+        assert detector.has_significant_change(frames['base'].copy()) is False
+        assert detector.has_significant_change(frames['small']) is False
+        assert detector.has_significant_change(frames['large']) is True
+
+        # The NumPy NCC agrees with the compiled kernel
+        a = cv2.resize(detector._extract_feature(frames['base']), ActivityDetector.THUMBNAIL_SIZE)
+        b = cv2.resize(detector._extract_feature(frames['small']), ActivityDetector.THUMBNAIL_SIZE)
+        assert module._ncc(a, b) == pytest.approx(activity_detector._ncc(a, b), abs=1e-4)
+
+    def test_ncc_compiled_lazily(self):
+        """Test importing the module doesn't compile the NCC kernel."""
+        if not activity_detector.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        module = load_module_copy()
+        assert module._ncc.signatures == []
+        
+        thumbnail = np.arange(48 * 64, dtype=np.uint8).reshape(48, 64)
+        assert module._ncc(thumbnail, thumbnail) == pytest.approx(1.0)
+        assert len(module._ncc.signatures) == 1
+    
+    def test_ncc_without_writable_jit_cache(self):
+        """Test the kernel still compiles when numba has nowhere to write its cache."""
+        if not activity_detector.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        import numba
+        real_njit = numba.njit
+        
+        def njit(*args, **kwargs):
+            if kwargs.get('cache'):
+                raise RuntimeError("cannot cache function '_ncc_kernel': no locator available")
+            return real_njit(*args, **kwargs)
+        
+        with patch.object(numba, 'njit', njit):
+            module = load_module_copy()
+        
+        thumbnail = np.arange(48 * 64, dtype=np.uint8).reshape(48, 64)
+        assert module._ncc(thumbnail, thumbnail) == pytest.approx(1.0)
+    
+    def test_ncc_flat_images(self):
+        """Test NCC of flat images is 1 only when both are the same level."""
+        black = np.zeros((48, 64), dtype=np.uint8)
+        grey = np.full((48, 64), 128, dtype=np.uint8)
+
+        assert activity_detector._ncc(black, black) == 1.0
+        assert activity_detector._ncc(black, grey) == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
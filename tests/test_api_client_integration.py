@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 import os
 import json
+import threading
 import time
 import requests
 from api_client import APIClient
@@ -37,6 +38,7 @@ class TestAPIClientIntegration(unittest.TestCase):
         self.client = APIClient()
         
     def tearDown(self):
+        self.client.close()
         self.config_patcher.stop()
         self.token_patcher.stop()
         self.datacache_cls_patcher.stop()
@@ -106,5 +108,120 @@ class TestAPIClientIntegration(unittest.TestCase):
         # 5. Verify post was called twice (once for new heartbeat, once for cached)
         self.assertEqual(self.client.session.post.call_count, 2)
 
+    def test_pending_drain_skipped_while_another_thread_drains(self):
+        self.client.cache.add_item('heartbeat', {'app_name': 'cached_app'})
+        self.client.session.post = MagicMock()
+        
+        # Another thread is already sending the cached items
+        with self.client._drain_lock:
+            self.client.process_pending_uploads()
+        
+        self.client.session.post.assert_not_called()
+        self.assertEqual(len(self.client.cache.get_pending_items()), 1)
+
+    def test_close_leaves_resources_to_busy_worker(self):
+        release = threading.Event()
+        self.client.upload_screenshot = MagicMock(
+            side_effect=lambda *args: release.wait(5) and {'status': 'success'}
+        )
+        
+        with patch.object(self.client, '_release', wraps=self.client._release) as release_spy:
+            self.client.queue_screenshot(b"image_data", {})
+            self.client.close(timeout=0.1)
+            
+            # The upload is still running, so its session and cache stay open
+            release_spy.assert_not_called()
+            self.assertTrue(self.client._upload_worker.is_alive())
+            
+            release.set()
+            self.client._upload_worker.join(5)
+            release_spy.assert_called_once()
+
+    def test_close_caches_screenshots_left_in_full_queue(self):
+        release = threading.Event()
+        started = threading.Event()
+        
+        def upload(*args):
+            started.set()
+            release.wait(5)
+            return {'status': 'success'}
+        self.client.upload_screenshot = MagicMock(side_effect=upload)
+        
+        # The worker is busy with one upload and the queue behind it is full
+        self.client.queue_screenshot(b"image_data", {})
+        self.assertTrue(started.wait(5))
+        for _ in range(APIClient.UPLOAD_QUEUE_SIZE):
+            self.assertTrue(self.client.queue_screenshot(b"image_data", {}))
+        
+        self.client.close(timeout=0.1)
+        release.set()
+        self.client._upload_worker.join(5)
+        
+        # The worker stopped after its upload and cached the rest before releasing
+        self.assertFalse(self.client._upload_worker.is_alive())
+        self.assertEqual(self.client.upload_screenshot.call_count, 1)
+        cache = self.original_datacache(self.test_db)
+        try:
+            self.assertEqual(len(cache.get_pending_items()), APIClient.UPLOAD_QUEUE_SIZE)
+        finally:
+            cache.close()
+
+    def test_queued_screenshot_uploaded_by_worker(self):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'status': 'success'}
+        mock_response.content = b'{"status": "success"}'
+        self.client.session.post = MagicMock(return_value=mock_response)
+        
+        self.assertTrue(self.client.queue_screenshot(b"image_data", {}))
+        self.client._upload_queue.join()
+        
+        self.assertEqual(self.client.session.post.call_count, 1)
+        self.assertEqual(len(self.client.cache.get_pending_items()), 0)
+
+    def test_failed_background_uploads_reported_once(self):
+        self.client.upload_screenshot = MagicMock(side_effect=[
+            {'status': 'success'},
+            {'status': 'cached', 'error': 'timed out'},
+            requests.exceptions.HTTPError("413"),
+        ])
+        
+        for _ in range(3):
+            self.client.queue_screenshot(b"image_data", {})
+        self.client._upload_queue.join()
+        
+        self.assertEqual(self.client.take_failed_uploads(), 2)
+        self.assertEqual(self.client.take_failed_uploads(), 0)
+
+    def test_queued_image_encoded_by_worker(self):
+        from PIL import Image
+        self.client._jpeg_quality = 70
+        self.client.session.post = MagicMock(side_effect=requests.exceptions.ConnectionError("offline"))
+        
+        self.assertTrue(self.client.queue_screenshot(Image.new('RGB', (32, 32), 'red'), {}))
+        self.client._upload_queue.join()
+        
+        items = self.client.cache.get_pending_items()
+        self.assertEqual(len(items), 1)
+        self.assertTrue(items[0][3].startswith(b'\xff\xd8'))
+
+    def test_refresh_config_picks_up_new_settings(self):
+        self.mock_config.capture_url = "http://new.com/capture"
+        self.mock_config.DEVICE_ID = "new_device"
+        
+        self.client.refresh_config()
+        
+        self.assertEqual(self.client._capture_url, "http://new.com/capture")
+        self.assertEqual(self.client.session.headers['X-Device-ID'], "new_device")
+
+    def test_session_uses_pooled_adapter(self):
+        adapter = self.client.session.get_adapter("https://test.com")
+        self.assertEqual(adapter._pool_maxsize, 8)
+        self.assertEqual(adapter.max_retries.total, 3)
+        # POST bodies aren't replayed: only connection failures are retried
+        self.assertEqual(adapter.max_retries.read, 0)
+        self.assertEqual(adapter.max_retries.status, 0)
+        self.assertEqual(self.client.session.headers['Accept-Encoding'], 'gzip')
+
 if __name__ == '__main__':
     unittest.main()
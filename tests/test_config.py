@@ -35,6 +35,21 @@ class TestConfig:
         config = Config()
         assert config.DEVICE_ID == "test-device-123"
     
+    @patch('config.socket.gethostname', return_value="My_PC.Local")
+    @patch('config.settings_manager')
+    def testdefault_device_id(self, mock_settings, mock_hostname):
+        """Test DEVICE_ID falls back to a sanitized hostname."""
+        from config import Config, default_device_id
+        
+        mock_settings.get_device_id.return_value = ""
+        default_device_id.cache_clear()
+        try:
+            assert Config().DEVICE_ID == "desktop-my-pc-local"
+            assert Config().DEVICE_ID == "desktop-my-pc-local"
+            assert mock_hostname.call_count == 1
+        finally:
+            default_device_id.cache_clear()
+    
     @patch('config.settings_manager')
     def test_capture_interval(self, mock_settings):
         """Test CAPTURE_INTERVAL property."""
@@ -78,6 +93,16 @@ class TestConfig:
         assert 'steam.exe' in processes
         assert 'game.exe' in processes
     
+    @patch('config.settings_manager')
+    def test_high_fidelity_activity(self, mock_settings):
+        """Test HIGH_FIDELITY_ACTIVITY property."""
+        from config import Config
+        
+        mock_settings.get_setting.return_value = True
+        
+        config = Config()
+        assert config.HIGH_FIDELITY_ACTIVITY is True
+    
     @patch('config.settings_manager')
     def test_max_image_width(self, mock_settings):
         """Test MAX_IMAGE_WIDTH property."""
@@ -129,6 +154,27 @@ class TestConfig:
         assert config.capture_url == "https://test.com/api/screentime/capture"
 
 
+class TestConfigCache:
+    """Test caching of settings reads."""
+    
+    @patch('config.settings_manager')
+    def test_values_cached_until_reload(self, mock_settings):
+        """Test repeated access doesn't re-read settings until reload()."""
+        from config import Config
+        
+        mock_settings.get_capture_interval.return_value = 60
+        
+        config = Config()
+        assert config.CAPTURE_INTERVAL == 60
+        assert config.CAPTURE_INTERVAL == 60
+        assert mock_settings.get_capture_interval.call_count == 1
+        
+        mock_settings.get_capture_interval.return_value = 120
+        config.reload()
+        assert config.CAPTURE_INTERVAL == 120
+        assert mock_settings.get_capture_interval.call_count == 2
+
+
 class TestConfigValidation:
     """Test configuration validation."""
     
@@ -230,6 +276,23 @@ class TestConfigValidation:
         with pytest.raises(ValueError, match="between 1 and 100"):
             config.validate()
 
+    
+    @patch('config.settings_manager')
+    def test_resolve_returns_frozen_snapshot(self, mock_settings):
+        """Test resolve() returns an immutable, validated snapshot."""
+        import dataclasses
+        from config import Config
+        
+        mock_settings.get_phoenix_url.return_value = "https://valid.com"
+        mock_settings.get_capture_interval.return_value = 60
+        mock_settings.get_similarity_threshold.return_value = 0.95
+        mock_settings.get_setting.side_effect = lambda key, default: default
+        
+        resolved = Config().resolve()
+        assert resolved.CAPTURE_INTERVAL == 60
+        assert resolved.capture_url == "https://valid.com/api/screentime/capture"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            resolved.CAPTURE_INTERVAL = 5
 
 class TestGlobalConfigInstance:
     """Test the global config instance."""
@@ -12,6 +12,7 @@ class TestDataCache(unittest.TestCase):
         self.cache = DataCache(self.test_db)
         
     def tearDown(self):
+        self.cache.close()
         self.cleanup_db()
         
     def cleanup_db(self):
@@ -43,6 +44,84 @@ class TestDataCache(unittest.TestCase):
         self.assertEqual(items[0][1], "screenshot")
         self.assertEqual(items[0][3], file_data)
         
+    def test_add_items_batch(self):
+        self.assertTrue(self.cache.add_items([
+            ("heartbeat", {"n": 1}, None),
+            ("screenshot", {"n": 2}, b"img"),
+        ]))
+        
+        items = self.cache.get_pending_items()
+        self.assertEqual(len(items), 2)
+        self.assertEqual(sorted(item[2]["n"] for item in items), [1, 2])
+        
+    def test_file_data_loaded_on_demand(self):
+        self.cache.add_item("screenshot", {}, b"image_data")
+        
+        items = self.cache.get_pending_items(with_files=False)
+        self.assertIsNone(items[0][3])
+        self.assertEqual(self.cache.get_file_data(items[0][0]), b"image_data")
+        
+        with self.cache.open_file_data(items[0][0]) as blob:
+            self.assertEqual(blob.read(), b"image_data")
+        
+        self.cache.remove_item(items[0][0])
+        self.assertIsNone(self.cache.get_file_data(items[0][0]))
+        self.assertIsNone(self.cache.open_file_data(items[0][0]))
+        
+    def test_open_file_data_survives_concurrent_delete(self):
+        self.cache.add_item("screenshot", {}, b"image_data")
+        item_id = self.cache.get_pending_items()[0][0]
+        
+        with self.cache.open_file_data(item_id) as blob:
+            self.assertEqual(len(blob), len(b"image_data"))
+            self.assertEqual(blob.read(5), b"image")
+            # The writer commits a delete of the same row mid-read
+            self.cache.remove_item(item_id)
+            self.cache.flush()
+            self.assertEqual(blob.read(), b"_data")
+        
+        self.assertIsNone(self.cache.open_file_data(item_id))
+        
+    def test_migrates_inline_file_data(self):
+        self.cache.close()
+        os.remove(self.test_db)
+        with sqlite3.connect(self.test_db) as conn:
+            conn.execute("""
+                CREATE TABLE pending_uploads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    type TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    file_data BLOB
+                )
+            """)
+            conn.execute(
+                "INSERT INTO pending_uploads (timestamp, type, data, file_data) VALUES (?, ?, ?, ?)",
+                (time.time(), "screenshot", json.dumps({"a": 1}), b"legacy")
+            )
+        conn.close()
+        
+        self.cache = DataCache(self.test_db)
+        items = self.cache.get_pending_items()
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0][2], {"a": 1})
+        self.assertEqual(items[0][3], b"legacy")
+        
+        with sqlite3.connect(self.test_db) as conn:
+            ts_type = conn.execute("SELECT typeof(ts) FROM pending_uploads").fetchone()[0]
+        conn.close()
+        self.assertEqual(ts_type, "integer")
+        
+    def test_metadata_stored_as_msgpack(self):
+        self.cache.add_item("heartbeat", {"app_name": "app"})
+        self.assertTrue(self.cache.flush(timeout=5))
+        
+        with sqlite3.connect(self.test_db) as conn:
+            stored_type = conn.execute("SELECT typeof(data) FROM pending_uploads").fetchone()[0]
+        conn.close()
+        self.assertEqual(stored_type, "blob")
+        self.assertEqual(self.cache.get_pending_items()[0][2], {"app_name": "app"})
+        
     def test_remove_item(self):
         self.cache.add_item("item1", {})
         items = self.cache.get_pending_items()
@@ -51,6 +130,17 @@ class TestDataCache(unittest.TestCase):
         self.assertTrue(self.cache.remove_item(item_id))
         self.assertEqual(len(self.cache.get_pending_items()), 0)
         
+    def test_remove_items(self):
+        self.cache.add_items([("item", {"n": n}, b"x") for n in range(5)])
+        ids = [item[0] for item in self.cache.get_pending_items()]
+        
+        self.cache.MAX_SQL_VARIABLES = 2
+        self.assertTrue(self.cache.remove_items(ids[:4]))
+        
+        remaining = self.cache.get_pending_items()
+        self.assertEqual([item[0] for item in remaining], ids[4:])
+        self.assertIsNone(self.cache.get_file_data(ids[0]))
+        
     def test_clear_cache(self):
         self.cache.add_item("item1", {})
         self.cache.add_item("item2", {})
@@ -64,6 +154,62 @@ class TestDataCache(unittest.TestCase):
         stats = self.cache.get_stats()
         self.assertEqual(stats['count'], 1)
         self.assertGreater(stats['size_bytes'], 0)
+        
+    def test_stats_count_tracks_writes(self):
+        self.cache.add_items([("item", {}, None)] * 3)
+        ids = [item[0] for item in self.cache.get_pending_items()]
+        self.cache.remove_item(ids[0])
+        self.cache.remove_items(ids[1:2] + [999])
+        self.assertEqual(self.cache.get_stats()['count'], 1)
+        
+        self.cache.close()
+        self.cache = DataCache(self.test_db)
+        self.assertEqual(self.cache.get_stats()['count'], 1)
+        
+        self.cache.clear_cache()
+        self.assertEqual(self.cache.get_stats()['count'], 0)
+        
+    def test_failed_op_only_drops_itself_from_batch(self):
+        self.cache.add_item("item", {})
+        self.cache.flush()
+        
+        # The second insert violates NOT NULL; the batch is replayed without it
+        self.cache._queue.put(('insert', [(1, "ok", "{}", None)]))
+        self.cache._queue.put(('insert', [(None, "bad", "{}", None)]))
+        self.assertEqual(self.cache.get_stats()['count'], 2)
+        types = [item[1] for item in self.cache.get_pending_items()]
+        self.assertEqual(sorted(types), ["item", "ok"])
+        
+    def test_stats_count_after_clear_and_insert_in_one_batch(self):
+        self.cache.add_items([("item", {}, None)] * 3)
+        self.cache.flush()
+        
+        self.cache.clear_cache()
+        self.cache.add_item("after", {})
+        self.assertEqual(self.cache.get_stats()['count'], 1)
+        
+    def test_use_after_close(self):
+        self.cache.add_item("item", {})
+        self.cache.close()
+        
+        self.assertFalse(self.cache.flush())
+        self.assertFalse(self.cache.add_item("late", {}))
+        self.assertFalse(self.cache.remove_items([1]))
+        self.assertEqual(self.cache.get_pending_items(), [])
+        self.assertIsNone(self.cache.open_file_data(1))
+        self.assertEqual(self.cache.get_stats()['count'], 0)
+        
+    def test_flush_returns_when_writer_stopped(self):
+        self.cache.add_item("item", {})
+        
+        # Stop the writer without closing the cache
+        self.cache._queue.put(('stop', None))
+        self.cache._writer.join(5)
+        
+        start = time.monotonic()
+        self.assertFalse(self.cache.flush())
+        self.assertEqual(len(self.cache.get_pending_items()), 1)
+        self.assertLess(time.monotonic() - start, 1)
 
 if __name__ == '__main__':
     unittest.main()
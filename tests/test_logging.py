@@ -7,6 +7,7 @@ import logging
 import sys
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import patch
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -30,6 +31,8 @@ class TestPhoenixLogger:
         
         assert phoenix_logger.name == "test_logger"
         assert phoenix_logger.session_id is not None
+        
+        phoenix_logger.logger.info("first record")
         assert phoenix_logger.log_dir.exists()
         assert phoenix_logger.log_file.exists()
     
@@ -43,6 +46,7 @@ class TestPhoenixLogger:
     def test_log_file_creation(self):
         """Test that log files are created."""
         phoenix_logger = PhoenixLogger("test_logger")
+        phoenix_logger.logger.info("first record")
         
         # Check main log file
         assert phoenix_logger.log_file.exists()
@@ -52,6 +56,63 @@ class TestPhoenixLogger:
         assert phoenix_logger.log_dir.exists()
         assert phoenix_logger.log_dir.name == "logs"
     
+    def test_files_created_on_first_record(self):
+        """Test log files are not set up until something is logged."""
+        phoenix_logger = PhoenixLogger("test_lazy")
+        assert phoenix_logger.listener is None
+        
+        phoenix_logger.logger.debug("first record")
+        phoenix_logger.close()
+        
+        assert phoenix_logger.listener is not None
+        assert "Session Started" in phoenix_logger.log_file.read_text(encoding='utf-8')
+    
+    def test_console_only_when_files_fail(self, capsys):
+        """Test a failed file setup is reported once and not retried."""
+        phoenix_logger = PhoenixLogger("test_no_files")
+        with patch.object(phoenix_logger, '_attach_file_handlers',
+                          side_effect=PermissionError("read-only")) as attach:
+            phoenix_logger.logger.info("first record")
+            phoenix_logger.logger.info("second record")
+        
+        attach.assert_called_once()
+        captured = capsys.readouterr()
+        assert captured.out.count("File logging disabled") == 1
+        assert "second record" in captured.out
+        assert "Logging error" not in captured.err
+    
+    def test_error_log_created_on_first_error(self):
+        """Test the errors-only file appears only once an error is logged."""
+        phoenix_logger = PhoenixLogger("test_error_file")
+        phoenix_logger.logger.warning("not an error")
+        phoenix_logger.close()
+        assert not phoenix_logger.error_log.exists()
+        
+        phoenix_logger = PhoenixLogger("test_error_file")
+        phoenix_logger.logger.error("an error")
+        phoenix_logger.close()
+        assert "an error" in phoenix_logger.error_log.read_text(encoding='utf-8')
+    
+    def test_latest_log_points_at_session(self):
+        """Test latest.log refers to the current session's log file."""
+        phoenix_logger = PhoenixLogger("test_latest")
+        phoenix_logger.logger.info("first record")
+        phoenix_logger.close()
+        
+        latest = phoenix_logger.log_dir / "latest.log"
+        if latest.is_symlink():
+            assert latest.resolve() == phoenix_logger.log_file.resolve()
+        else:
+            assert latest.read_text() == str(phoenix_logger.log_file)
+    
+    def test_file_written_by_listener(self):
+        """Test records queued for the listener thread reach the log file."""
+        phoenix_logger = PhoenixLogger("test_listener")
+        phoenix_logger.logger.debug("queued debug message")
+        phoenix_logger.close()
+        
+        assert "queued debug message" in phoenix_logger.log_file.read_text(encoding='utf-8')
+    
     def test_get_logger(self):
         """Test get_logger returns a logger instance."""
         logger = get_logger("test_module")
@@ -129,6 +129,28 @@ class TestTokenManager:
         manager = TokenManager()
         assert manager.has_token() is False
 
+    @patch('token_manager.WINDOWS_AVAILABLE', True)
+    @patch('token_manager.win32cred', create=True)
+    @patch('token_manager.win32con', create=True)
+    @patch('token_manager.config')
+    def test_get_token_cached_until_save(self, mock_config, mock_win32con, mock_cred):
+        """Test repeated lookups are cached and save_token invalidates the cache."""
+        mock_config.DEVICE_ID = "test-device"
+        mock_win32con.CRED_TYPE_GENERIC = 1
+        mock_cred.CredRead = Mock(return_value={'CredentialBlob': 'test_token_12345'})
+
+        from token_manager import TokenManager
+
+        manager = TokenManager()
+        assert manager.get_token() == "test_token_12345"
+        assert manager.get_token() == "test_token_12345"
+        mock_cred.CredRead.assert_called_once()
+
+        manager.save_token("new_token_67890")
+        mock_cred.CredRead.return_value = {'CredentialBlob': 'new_token_67890'}
+        assert manager.get_token() == "new_token_67890"
+        assert mock_cred.CredRead.call_count == 2
+
 
 class TestTokenSecurity:
     """Test token security features."""
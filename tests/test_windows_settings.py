@@ -99,6 +99,27 @@ class TestWindowsSettingsManager:
         
         assert isinstance(all_settings, dict)
         assert "setting1" in all_settings or "setting2" in all_settings
+    
+    def test_save_many(self, settings_manager):
+        """Test saving several settings at once."""
+        assert settings_manager.save_many({"flag": True, "count": 3, "name": "phoenix"})
+        
+        assert settings_manager.get_setting("flag") is True
+        assert settings_manager.get_setting("count") == 3
+        assert settings_manager.get_setting("name") == "phoenix"
+    
+    def test_snapshot_matches_get_setting(self, settings_manager):
+        """Test snapshot decodes values the same way as get_setting."""
+        settings_manager.save_setting("flag", False)
+        settings_manager.save_setting("count", 7)
+        settings_manager.save_setting("ratio", 0.5)
+        settings_manager.save_setting("name", "phoenix")
+        
+        snapshot = settings_manager.snapshot()
+        
+        for name in ("flag", "count", "ratio", "name"):
+            assert snapshot[name] == settings_manager.get_setting(name)
+        assert snapshot["flag"] is False
 
 
 class TestConvenienceMethods:
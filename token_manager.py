@@ -3,6 +3,7 @@ Secure token management for Phoenix Desktop Tracker.
 Uses Windows Credential Manager to securely store authentication tokens.
 """
 import sys
+import time
 from typing import Optional
 
 try:
@@ -23,9 +24,12 @@ class TokenManager:
     
     TARGET_NAME = f"PhoenixTracker_{config.DEVICE_ID}"
     FALLBACK_FILE = ".phoenix_token.enc"
+    # Seconds get_token() reuses the last lookup before asking the store again
+    TOKEN_CACHE_TTL = 5.0
     
     def __init__(self):
         """Initialize token manager."""
+        self._token_cache = None  # (monotonic time, token) of the last lookup
         if not WINDOWS_AVAILABLE:
             print("⚠️  Warning: pywin32 not available. Using encrypted file storage as fallback.")
             self._init_fallback_encryption()
@@ -47,6 +51,7 @@ class TokenManager:
         Args:
             token: JWT or API token to store
         """
+        self._token_cache = None
         if WINDOWS_AVAILABLE:
             self._store_windows(token)
         else:
@@ -80,10 +85,16 @@ class TokenManager:
         Returns:
             The stored token, or None if not found
         """
+        now = time.monotonic()
+        if self._token_cache and now - self._token_cache[0] < self.TOKEN_CACHE_TTL:
+            return self._token_cache[1]
+        
         if WINDOWS_AVAILABLE:
-            return self._get_windows()
+            token = self._get_windows()
         else:
-            return self._get_fallback()
+            token = self._get_fallback()
+        self._token_cache = (now, token)
+        return token
     
     def _get_windows(self) -> Optional[str]:
         """Retrieve token from Windows Credential Manager."""
@@ -111,6 +122,7 @@ class TokenManager:
     
     def delete_token(self) -> None:
         """Delete the stored token."""
+        self._token_cache = None
         if WINDOWS_AVAILABLE:
             self._delete_windows()
         else:
@@ -8,6 +8,7 @@ import threading
 import time
 import logging
 from pathlib import Path
+from typing import Optional
 from PIL import Image, ImageDraw
 import pystray
 from pystray import MenuItem as Item
@@ -18,6 +19,7 @@ from tkinter import messagebox
 sys.path.insert(0, str(Path(__file__).parent))
 
 from windows_settings import settings_manager
+from config import config, resolve
 from gui_settings import ModernSettingsWindow
 from token_manager import TokenManager
 from api_client import create_client
@@ -25,7 +27,6 @@ from window_detector import WindowDetector
 from activity_detector import ActivityDetector
 from gaming_detector import GamingDetector
 import mss
-from io import BytesIO
 
 # Setup logging
 logging.basicConfig(
@@ -57,11 +58,16 @@ def create_icon_image():
 class PhoenixTrayApp:
     """System tray application for Phoenix Desktop Tracker."""
     
+    # Seconds to wait before retrying a heartbeat or capture that failed
+    RETRY_INTERVAL = 5
+    
     def __init__(self):
         """Initialize the system tray application."""
         self.icon = None
         self.running = False
         self.tracker_thread = None
+        # Set to wake the tracker loop early when tracking stops
+        self._stop_event = threading.Event()
         self.token_manager = TokenManager()
         
         # Tracking state
@@ -70,9 +76,15 @@ class PhoenixTrayApp:
         self.activity_detector = ActivityDetector()
         self.gaming_detector = GamingDetector()
         
-        self.last_heartbeat = 0
-        self.last_capture = 0
+        # Monotonic timestamps; -inf makes both actions due on the first pass
+        self.last_heartbeat = float('-inf')
+        self.last_capture = float('-inf')
         self.consecutive_errors = 0
+        
+        # Screen grabber, opened on the tracker thread and reused across captures
+        self._sct = None
+        self._monitor = None
+        self._target_size = None
         self.max_consecutive_errors = 5
         
         # Check if first-time setup is needed
@@ -143,15 +155,22 @@ class PhoenixTrayApp:
         )
         
         if token:
-            if self.token_manager.save_token(token.strip()):
-                messagebox.showinfo("Success", "Token saved successfully!", parent=root)
+            # save_token() returns nothing; it raises if the token can't be stored
+            try:
+                self.token_manager.save_token(token.strip())
+            except Exception as e:
+                logger.error(f"Failed to save token: {e}")
+                messagebox.showerror("Error", f"Failed to save token: {e}", parent=root)
             else:
-                messagebox.showerror("Error", "Failed to save token", parent=root)
+                messagebox.showinfo("Success", "Token saved successfully!", parent=root)
         
         root.destroy()
     
     def on_settings_saved(self):
         """Callback when settings are saved."""
+        # Pick up the new values on next access
+        config.reload()
+        
         # Restart tracker if it was running
         was_running = self.running
         if was_running:
@@ -191,6 +210,16 @@ class PhoenixTrayApp:
             self.open_settings()
             return
         
+        try:
+            resolve()
+        except ValueError as e:
+            root = tk.Tk()
+            root.withdraw()
+            messagebox.showerror("Invalid Configuration", str(e), parent=root)
+            root.destroy()
+            self.open_settings()
+            return
+        
         # Check token
         if not self.token_manager.get_token():
             root = tk.Tk()
@@ -218,6 +247,7 @@ class PhoenixTrayApp:
             return
         
         self.running = True
+        self._stop_event.clear()
         self.tracker_thread = threading.Thread(target=self.tracker_loop, daemon=True)
         self.tracker_thread.start()
         
@@ -227,9 +257,14 @@ class PhoenixTrayApp:
     def stop_tracking(self):
         """Stop the tracking thread."""
         self.running = False
+        self._stop_event.set()
         if self.tracker_thread:
             self.tracker_thread.join(timeout=5)
         
+        if self.api_client:
+            self.api_client.close()
+            self.api_client = None
+        
         logger.info("⏸️ Tracker stopped")
         self.update_menu()
     
@@ -239,17 +274,17 @@ class PhoenixTrayApp:
         
         while self.running:
             try:
-                current_time = time.time()
+                current_time = time.monotonic()
                 
                 # Check for gaming mode
-                if self.gaming_detector.is_gaming():
-                    game = self.gaming_detector.get_running_game()
+                gaming, game = self.gaming_detector.check()
+                if gaming:
                     logger.info(f"🎮 Gaming detected ({game}), pausing for 5 minutes")
-                    time.sleep(300)
+                    self._stop_event.wait(300)
                     continue
                 
                 # Send heartbeat
-                heartbeat_interval = settings_manager.get_heartbeat_interval()
+                heartbeat_interval = config.HEARTBEAT_INTERVAL
                 if current_time - self.last_heartbeat >= heartbeat_interval:
                     if self.send_heartbeat():
                         self.last_heartbeat = current_time
@@ -258,7 +293,7 @@ class PhoenixTrayApp:
                         self.consecutive_errors += 1
                 
                 # Capture and upload screenshot
-                capture_interval = settings_manager.get_capture_interval()
+                capture_interval = config.CAPTURE_INTERVAL
                 if current_time - self.last_capture >= capture_interval:
                     if self.process_screenshot():
                         self.last_capture = current_time
@@ -269,15 +304,24 @@ class PhoenixTrayApp:
                 # Check for too many errors
                 if self.consecutive_errors >= self.max_consecutive_errors:
                     logger.error(f"Too many consecutive errors ({self.consecutive_errors}). Pausing for 5 minutes.")
-                    time.sleep(300)
+                    self._stop_event.wait(300)
                     self.consecutive_errors = 0
+                    continue
                 
-                time.sleep(5)  # Main loop interval
+                # Sleep until the next action is due; anything still due failed, so back off
+                next_due = min(self.last_heartbeat + heartbeat_interval,
+                               self.last_capture + capture_interval)
+                sleep_for = next_due - time.monotonic()
+                if sleep_for <= 0:
+                    sleep_for = self.RETRY_INTERVAL
+                self._stop_event.wait(sleep_for)
                 
             except Exception as e:
                 logger.error(f"Error in tracker loop: {e}", exc_info=True)
-                time.sleep(60)
+                self._stop_event.wait(60)
         
+        # Display handles belong to this thread, so release them here
+        self._close_grabber()
         logger.info("Tracker loop stopped")
     
     def send_heartbeat(self) -> bool:
@@ -306,52 +350,83 @@ class PhoenixTrayApp:
             return False
         
         try:
+            # Uploads finish on the worker thread, so earlier failures are reported here
+            failed_uploads = self.api_client.take_failed_uploads()
+            if failed_uploads:
+                logger.warning(f"{failed_uploads} background screenshot upload(s) failed")
+            
             # Capture screen
-            screenshot_bytes = self.capture_screen()
-            if not screenshot_bytes:
+            img = self.capture_screen()
+            if img is None:
                 return False
             
-            # Check for significant change
-            img = Image.open(BytesIO(screenshot_bytes))
-            if not self.activity_detector.has_significant_change(img):
+            # Check for significant change on the raw frame, before any encoding.
+            # The detector only compares luma, so hand it one channel instead of three;
+            # the colour frame is still what gets uploaded.
+            probe = img.convert("L") if self.activity_detector.accepts_grayscale else img
+            if not self.activity_detector.has_significant_change(probe):
                 logger.debug("No significant change detected, skipping upload")
-                return True
-            
-            # Upload screenshot
-            result = self.api_client.upload_screenshot(screenshot_bytes)
+                return not failed_uploads
             
-            if result.get('status') == 'rate_limited':
-                logger.warning(f"Rate limited, retry in {result.get('retry_after', 0):.0f}s")
-                return True
-            
-            return result.get('status') in ['success', 'processed']
+            # JPEG encoding and upload both happen on the upload worker; a full
+            # queue means uploads are falling behind, so it counts as an error too
+            queued = self.api_client.queue_screenshot(img)
+            return queued and not failed_uploads
         except Exception as e:
             logger.error(f"Screenshot processing failed: {e}")
             return False
     
-    def capture_screen(self):
-        """Capture the current screen and return as JPEG bytes."""
+    def capture_screen(self) -> Optional[Image.Image]:
+        """
+        Capture the current screen as a resized PIL image.
+        
+        The image is not JPEG-encoded here; that only happens on the upload
+        worker for frames that pass the activity check.
+        """
         try:
-            with mss.mss() as sct:
-                monitor = sct.monitors[1]
-                screenshot = sct.grab(monitor)
-                
-                img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                
-                # Resize for efficiency
-                max_width = settings_manager.get_setting('max_image_width', 1024)
-                img.thumbnail((max_width, max_width))
-                
-                # Convert to JPEG bytes
-                img_byte_arr = BytesIO()
-                jpeg_quality = settings_manager.get_setting('jpeg_quality', 70)
-                img.save(img_byte_arr, format='JPEG', quality=jpeg_quality)
-                
-                return img_byte_arr.getvalue()
+            if self._sct is None:
+                self._sct = mss.mss()
+                self._monitor = self._sct.monitors[1]
+                self._target_size = self._fit_size(
+                    (self._monitor['width'], self._monitor['height']),
+                    config.MAX_IMAGE_WIDTH
+                )
+            
+            screenshot = self._sct.grab(self._monitor)
+            
+            # Read mss's bytearray directly: .bgra would first copy it into a bytes object.
+            # BGRX -> RGB is still a full unpack into a new image; Pillow only shares the
+            # buffer when the raw mode matches the image mode.
+            img = Image.frombuffer("RGB", screenshot.size, screenshot.raw, "raw", "BGRX", 0, 1)
+            
+            # Resize for efficiency; bilinear is plenty for upload and change detection
+            if img.size != self._target_size:
+                img = img.resize(self._target_size, Image.Resampling.BILINEAR)
+            
+            return img
         except Exception as e:
             logger.error(f"Screenshot capture failed: {e}")
+            # Reopen on the next capture in case the display setup changed
+            self._close_grabber()
             return None
     
+    @staticmethod
+    def _fit_size(size, max_side: int):
+        """Scale (width, height) down, keeping aspect ratio, so neither side exceeds max_side."""
+        width, height = size
+        scale = min(1.0, max_side / max(width, height))
+        return (max(1, round(width * scale)), max(1, round(height * scale)))
+    
+    def _close_grabber(self):
+        """Release the screen grabber's display handles."""
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            finally:
+                self._sct = None
+                self._monitor = None
+                self._target_size = None
+    
     def view_logs(self, icon=None, item=None):
         """Open the log file."""
         log_path = Path(__file__).parent / "phoenix_tracker.log"
@@ -46,21 +46,7 @@ class WindowsSettingsManager:
                 winreg.KEY_WRITE
             )
             
-            # Convert value based on type
-            if isinstance(value, bool):
-                # Store booleans as string to preserve type on retrieval
-                winreg.SetValueEx(key, name, 0, winreg.REG_SZ, str(value))
-            elif isinstance(value, int):
-                winreg.SetValueEx(key, name, 0, winreg.REG_DWORD, value)
-            elif isinstance(value, str):
-                winreg.SetValueEx(key, name, 0, winreg.REG_SZ, value)
-            elif isinstance(value, (dict, list)):
-                # Store complex types as JSON
-                json_str = json.dumps(value)
-                winreg.SetValueEx(key, name, 0, winreg.REG_SZ, json_str)
-            else:
-                # Default to string representation
-                winreg.SetValueEx(key, name, 0, winreg.REG_SZ, str(value))
+            self._set_value(key, name, value)
             
             winreg.CloseKey(key)
             logger.debug(f"Saved setting: {name}")
@@ -70,6 +56,92 @@ class WindowsSettingsManager:
             logger.error(f"Failed to save setting {name}: {e}")
             return False
     
+    def save_many(self, settings: Dict[str, Any]) -> bool:
+        """
+        Save several settings with a single open of the registry key.
+        
+        Args:
+            settings: Dictionary of setting name to value, stored as in save_setting()
+        
+        Returns:
+            True if every setting was saved
+        """
+        if not settings:
+            return True
+        
+        try:
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self.REGISTRY_PATH,
+                0,
+                winreg.KEY_WRITE
+            )
+            
+            try:
+                for name, value in settings.items():
+                    self._set_value(key, name, value)
+            finally:
+                winreg.CloseKey(key)
+            
+            logger.debug(f"Saved settings: {', '.join(settings)}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save settings {', '.join(settings)}: {e}")
+            return False
+    
+    @staticmethod
+    def _set_value(key: Any, name: str, value: Any) -> None:
+        """
+        Write one value to an open registry key, choosing the type from the value.
+        
+        Args:
+            key: Registry key opened with KEY_WRITE
+            name: Setting name
+            value: Setting value (str, int, bool, or dict/list as JSON)
+        """
+        if isinstance(value, bool):
+            # Store booleans as string to preserve type on retrieval
+            winreg.SetValueEx(key, name, 0, winreg.REG_SZ, str(value))
+        elif isinstance(value, int):
+            winreg.SetValueEx(key, name, 0, winreg.REG_DWORD, value)
+        elif isinstance(value, str):
+            winreg.SetValueEx(key, name, 0, winreg.REG_SZ, value)
+        elif isinstance(value, (dict, list)):
+            # Store complex types as JSON
+            json_str = json.dumps(value)
+            winreg.SetValueEx(key, name, 0, winreg.REG_SZ, json_str)
+        else:
+            # Default to string representation
+            winreg.SetValueEx(key, name, 0, winreg.REG_SZ, str(value))
+    
+    @staticmethod
+    def _decode_value(value: Any, value_type: int) -> Any:
+        """
+        Convert a raw registry value back to the type it was saved as.
+        
+        Args:
+            value: Value as returned by the registry
+            value_type: Registry value type (REG_SZ, REG_DWORD, ...)
+        
+        Returns:
+            Decoded value
+        """
+        # Try to parse JSON for complex types
+        if value_type == winreg.REG_SZ and isinstance(value, str):
+            try:
+                # Handle plain boolean strings
+                if value == "True":
+                    return True
+                if value == "False":
+                    return False
+                    
+                return json.loads(value)
+            except (json.JSONDecodeError, TypeError):
+                return value
+        
+        return value
+    
     def get_setting(self, name: str, default: Any = None) -> Any:
         """
         Get a setting from Windows Registry.
@@ -92,20 +164,7 @@ class WindowsSettingsManager:
             value, value_type = winreg.QueryValueEx(key, name)
             winreg.CloseKey(key)
 
-            # Try to parse JSON for complex types
-            if value_type == winreg.REG_SZ and isinstance(value, str):
-                try:
-                    # Handle plain boolean strings
-                    if value == "True":
-                        return True
-                    if value == "False":
-                        return False
-                        
-                    return json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    return value
-            
-            return value
+            return self._decode_value(value, value_type)
 
         except FileNotFoundError:
             logger.debug(f"Setting not found: {name}, using default: {default}")
@@ -187,6 +246,43 @@ class WindowsSettingsManager:
         
         return settings
     
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Read every setting with a single open of the registry key.
+        
+        Values are decoded the same way as get_setting(), so the result can
+        stand in for a series of get_* calls.
+        
+        Returns:
+            Dictionary of setting name to decoded value
+        """
+        settings = {}
+        
+        try:
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self.REGISTRY_PATH,
+                0,
+                winreg.KEY_READ
+            )
+            
+            try:
+                index = 0
+                while True:
+                    try:
+                        name, value, value_type = winreg.EnumValue(key, index)
+                    except OSError:
+                        break
+                    settings[name] = self._decode_value(value, value_type)
+                    index += 1
+            finally:
+                winreg.CloseKey(key)
+            
+        except Exception as e:
+            logger.error(f"Failed to read settings snapshot: {e}")
+        
+        return settings
+    
     def clear_all_settings(self) -> bool:
         """
         Clear all settings from Windows Registry.